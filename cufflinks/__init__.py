@@ -8,28 +8,61 @@ Author: @jorgesantos
 """
 from __future__ import absolute_import
 
+import importlib
+import sys
+
 from . import date_tools
 from . import utils
 from . import datagen
 from . import helper
-from . import tools
 from . import colors
-from . import pandastools
-from . import ta
 from . import themes
+from . import accessor
 
 from .helper import _printer as help
-from .plotlytools import *
-from plotly.graph_objs import *
+if accessor.PANDAS_API == 'methods':
+	from . import tools
+	from . import pandastools
+	from . import ta
+	from .plotlytools import *
+	from .tools import subplots,scatter_matrix,figures,getLayout,getThemes,getTheme
+	from .quant_figure import QuantFig
 from .colors import cnames, get_colorscale
 from .utils import pp
-from .tools import subplots,scatter_matrix,figures,getLayout,getThemes,getTheme
 from .extract import to_df
-from .auth import set_config_file,get_config_file
-from .quant_figure import QuantFig
+from .auth import set_config_file,get_config_file,reload_config
 from .offline import is_offline,go_offline,go_online
 from .version import __version__
 
+# Plotly graph objects (cf.Scatter, cf.Layout, ...) are resolved on
+# first access rather than star-imported at load time. With
+# CUFFLINKS_PANDAS_API=accessor the plotting modules are resolved
+# the same way.
+_LAZY_MODULES = ('tools','pandastools','ta','plotlytools','quant_figure')
+_LAZY_ATTRS = dict([(_,'tools') for _ in ('subplots','scatter_matrix','figures',
+					'getLayout','getThemes','getTheme')],QuantFig='quant_figure')
+
+if sys.version_info >= (3,7):
+	def __getattr__(name):
+		if name in _LAZY_MODULES:
+			return importlib.import_module('.'+name,__name__)
+		if name in _LAZY_ATTRS:
+			return getattr(importlib.import_module('.'+_LAZY_ATTRS[name],__name__),name)
+		if not name.startswith('_'):
+			plotlytools = importlib.import_module('.plotlytools',__name__)
+			if hasattr(plotlytools,name):
+				return getattr(plotlytools,name)
+		import plotly.graph_objs as go
+		if name in getattr(go,'__all__',()):
+			return getattr(go,name)
+		raise AttributeError("module '{0}' has no attribute '{1}'".format(__name__,name))
+
+	def __dir__():
+		import plotly.graph_objs as go
+		return sorted(set(globals()) | set(_LAZY_MODULES) | set(_LAZY_ATTRS) | set(getattr(go,'__all__',())))
+else:
+	from plotly.graph_objs import *
+
 try:
 	if get_config_file()['offline']:
 		go_offline()
@@ -42,7 +75,8 @@ except:
 
 try: 
 	colors.cnames = utils.merge_dict(colors.cnames,auth.get_user_colors())
-	colors._scales_names = utils.merge_dict(colors._scales_names,auth.get_user_scales())
+	colors._user_scales = auth.get_user_scales()
+	colors.reset_scales()
 	themes.THEMES = utils.merge_dict(themes.THEMES,auth.get_user_themes())
 except:
 	pass
\ No newline at end of file
@@ -0,0 +1,99 @@
+import functools
+import importlib
+import os
+import sys
+import warnings
+
+## Pandas API
+#  methods  : iplot, figure, ta_plot, normalize, etc. are attached
+#			  to pd.DataFrame and pd.Series on import (default)
+#  accessor : only the df.cf / series.cf accessor is registered;
+#			  the plotting and TA modules are imported on first
+#			  attribute access
+#  The mode can be set with the CUFFLINKS_PANDAS_API environment
+#  variable. The .cf accessor is available in both modes.
+PANDAS_API = os.environ.get('CUFFLINKS_PANDAS_API','methods').lower()
+if PANDAS_API not in ('methods','accessor'):
+	warnings.warn("Invalid CUFFLINKS_PANDAS_API: '{0}', "
+				  "using 'methods' instead".format(PANDAS_API))
+	PANDAS_API = 'methods'
+
+try:
+	from pandas.api.extensions import register_dataframe_accessor, register_series_accessor
+except ImportError:
+	register_dataframe_accessor = register_series_accessor = None
+
+if PANDAS_API == 'accessor' and (register_dataframe_accessor is None or sys.version_info < (3,7)):
+	warnings.warn("CUFFLINKS_PANDAS_API='accessor' requires pandas>=0.23 "
+				  "and Python>=3.7, using 'methods' instead")
+	PANDAS_API = 'methods'
+
+# accessor attribute : (module, function)
+DATAFRAME_METHODS = {
+	'iplot' : ('plotlytools','_iplot'),
+	'figure' : ('plotlytools','_figure'),
+	'layout' : ('plotlytools','_layout'),
+	'to_iplot' : ('plotlytools','_to_iplot'),
+	'scatter_matrix' : ('plotlytools','_scatter_matrix'),
+	'ta_plot' : ('plotlytools','_ta_plot'),
+	'ta_figure' : ('plotlytools','_ta_figure'),
+	'screen' : ('pandastools','_screen'),
+	'swapcolumns' : ('pandastools','_swapcolumns'),
+	'normalize' : ('pandastools','normalize')
+}
+
+SERIES_METHODS = {
+	'iplot' : ('plotlytools','_iplot'),
+	'figure' : ('plotlytools','_figure'),
+	'to_iplot' : ('plotlytools','_to_iplot'),
+	'ta_plot' : ('plotlytools','_ta_plot'),
+	'ta_figure' : ('plotlytools','_ta_figure'),
+	'normalize' : ('pandastools','normalize'),
+	'bestfit' : ('pandastools','bestfit')
+}
+
+
+class _CufflinksAccessor(object):
+	"""
+	Exposes the cufflinks methods under the .cf namespace
+	of a DataFrame or Series.
+
+	The module that implements a method is only imported
+	the first time the method is accessed.
+
+	Example:
+		df.cf.iplot(kind='bar')
+		df.cf.ta_plot(study='sma',periods=[13,21])
+	"""
+	_methods = {}
+
+	def __init__(self, obj):
+		self._obj = obj
+
+	def __getattr__(self, name):
+		if name not in self._methods:
+			raise AttributeError("'{0}' object has no attribute '{1}'".format(
+				self.__class__.__name__,name))
+		module, func = self._methods[name]
+		func = getattr(importlib.import_module('.'+module,__package__),func)
+		method = functools.partial(func,self._obj)
+		functools.update_wrapper(method,func)
+		return method
+
+	def __dir__(self):
+		return sorted(self._methods)
+
+
+class DataFrameAccessor(_CufflinksAccessor):
+	__doc__ = _CufflinksAccessor.__doc__
+	_methods = DATAFRAME_METHODS
+
+
+class SeriesAccessor(_CufflinksAccessor):
+	__doc__ = _CufflinksAccessor.__doc__
+	_methods = SERIES_METHODS
+
+
+if register_dataframe_accessor is not None:
+	register_dataframe_accessor('cf')(DataFrameAccessor)
+	register_series_accessor('cf')(SeriesAccessor)
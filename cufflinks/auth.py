@@ -4,13 +4,28 @@ Based in Plotly's tools module
 
 
 import os
+import copy
 import json
 import warnings
 from .offline import go_offline
 
 package='cufflinks'
 
-if os.path.exists(os.path.join(os.path.expanduser('~'),os.path.join('Dropbox','AppData'))):
+# Configuration backend
+#	file : configuration and user colors, scales and themes
+#		   are stored in `~/.cufflinks` 
+#	memory : everything is kept in memory and the filesystem 
+#		   is never accessed. Initial values can be set 
+#		   with the CUFFLINKS_CONFIG, CUFFLINKS_COLORS,
+#		   CUFFLINKS_SCALES and CUFFLINKS_THEMES environment 
+#		   variables (JSON strings)
+_CONFIG_BACKEND = os.environ.get('CUFFLINKS_CONFIG_BACKEND','file').lower()
+if _CONFIG_BACKEND not in ('file','memory'):
+	warnings.warn("Invalid CUFFLINKS_CONFIG_BACKEND: '{0}', "
+				  "using 'file' instead".format(_CONFIG_BACKEND))
+	_CONFIG_BACKEND = 'file'
+
+if _CONFIG_BACKEND=='file' and os.path.exists(os.path.join(os.path.expanduser('~'),os.path.join('Dropbox','AppData'))):
 	AUTH_DIR=os.path.join(os.path.join(os.path.expanduser('~'),os.path.join('Dropbox','AppData')),'.'+package)
 else:
 	AUTH_DIR = os.path.join(os.path.expanduser("~"), "."+package)
@@ -37,22 +52,111 @@ _FILE_CONTENT = {
 				 		"datagen_mode" : 'stocks',
 				 		"dimensions" : None,
 						"margin" : None,
-						"offline_config" : None
-						}
+						"offline_config" : None,
+						"serializer" : "auto"
+						},
+				 COLORS_FILE: {},
+				 SCALES_FILE: {},
+				 THEMES_FILE: {}
+				 }
+
+_ENV_CONTENT = {
+				 CONFIG_FILE: 'CUFFLINKS_CONFIG',
+				 COLORS_FILE: 'CUFFLINKS_COLORS',
+				 SCALES_FILE: 'CUFFLINKS_SCALES',
+				 THEMES_FILE: 'CUFFLINKS_THEMES'
 				 }
 
-try:
-	os.mkdir(TEST_DIR)
-	os.rmdir(TEST_DIR)
-	if not os.path.exists(AUTH_DIR):
-		os.mkdir(AUTH_DIR)
-	f = open(TEST_FILE, 'w')
-	f.write('testing\n')
-	f.close()
-	os.remove(TEST_FILE)
-	_file_permissions = True
-except:
-	_file_permissions = False                 
+_MEMORY_CONTENT = {}
+
+_CONFIG_CACHE = {}
+
+def _check_file_permissions():
+	try:
+		os.mkdir(TEST_DIR)
+		os.rmdir(TEST_DIR)
+		if not os.path.exists(AUTH_DIR):
+			os.mkdir(AUTH_DIR)
+		f = open(TEST_FILE, 'w')
+		f.write('testing\n')
+		f.close()
+		os.remove(TEST_FILE)
+		return True
+	except:
+		return False                 
+
+_file_permissions = _check_file_permissions() if _CONFIG_BACKEND=='file' else False
+
+
+def get_backend():
+	"""
+	Returns the configuration backend in use
+		file : `~/.cufflinks`
+		memory : in-process only
+	"""
+	return _CONFIG_BACKEND
+
+def _memory_content(filename):
+	"""
+	Returns the in-memory content for a given file. 
+	The content is initialized from the defaults and 
+	the corresponding environment variable (JSON string).
+	"""
+	if filename not in _MEMORY_CONTENT:
+		content = copy.deepcopy(_FILE_CONTENT[filename])
+		value = os.environ.get(_ENV_CONTENT[filename],'')
+		if value:
+			try:
+				data = json.loads(value)
+			except ValueError:
+				raise Exception("Invalid JSON in {0}".format(_ENV_CONTENT[filename]))
+			if filename == CONFIG_FILE:
+				data = dict([(k,v) for k,v in list(data.items()) if k in content])
+			content.update(data)
+		_MEMORY_CONTENT[filename] = content
+	return _MEMORY_CONTENT[filename]
+
+def _get_content(filename, *args):
+	"""
+	Returns specified args from a configuration file 
+	through the active backend.
+	"""
+	if _CONFIG_BACKEND == 'memory':
+		content = _memory_content(filename)
+	elif _file_permissions:
+		ensure_local_files()  
+		return load_json_dict(filename, *args)
+	else:
+		content = _FILE_CONTENT[filename]
+	if args:
+		return {key: copy.deepcopy(content[key]) for key in args if key in content}
+	return copy.deepcopy(content)
+
+def set_backend(backend):
+	"""
+	Sets the configuration backend for the current process.
+
+	Parameters:
+	-----------
+		backend : string
+			file : configuration is read from and saved to
+				`~/.cufflinks`
+			memory : configuration is only kept in memory.
+				The current configuration is used as
+				a starting point.
+	"""
+	global _CONFIG_BACKEND, _file_permissions
+	if backend not in ('file','memory'):
+		raise Exception("Invalid backend : '{0}'".format(backend))
+	if backend == _CONFIG_BACKEND:
+		return
+	if backend == 'memory':
+		_MEMORY_CONTENT[CONFIG_FILE] = get_config_file()
+		_CONFIG_BACKEND = 'memory'
+	else:
+		_CONFIG_BACKEND = 'file'
+		_file_permissions = _check_file_permissions()
+		reload_config()
 
 
 def get_path():
@@ -73,14 +177,16 @@ def ensure_local_files():
 			os.mkdir(AUTH_DIR)
 		for fn in [CONFIG_FILE]:
 			contents = load_json_dict(fn)
+			valid_contents = dict(contents)
 			for key, val in list(_FILE_CONTENT[fn].items()):
-				if key not in contents:
-					contents[key] = val
-			contents_keys = list(contents.keys())
+				if key not in valid_contents:
+					valid_contents[key] = val
+			contents_keys = list(valid_contents.keys())
 			for key in contents_keys:
 				if key not in _FILE_CONTENT[fn]:
-					del contents[key]
-			save_json_dict(fn, contents)
+					del valid_contents[key]
+			if valid_contents != contents or not os.path.exists(fn):
+				save_json_dict(fn, valid_contents)
 	else:
 		warnings.warn("Looks like you don't have 'read-write' permission to "
 					  "your 'home' ('~') directory")
@@ -88,8 +194,8 @@ def ensure_local_files():
 
 def set_config_file(sharing=None,theme=None,colorscale=None,offline=None,offline_connected=None,
 					offline_url=None,offline_show_link=None,offline_link_text=None,
-					offline_config=None,
-					datagen_mode=None,**kwargs):
+					offline_config=None,serializer=None,
+					datagen_mode=None,backend=None,**kwargs):
 	"""
 	Set the keyword-value pairs in `~/.config`.
 
@@ -121,6 +227,12 @@ def set_config_file(sharing=None,theme=None,colorscale=None,offline=None,offline
 			Additional configuration options
 			For the complete list of config options check out: 
 			https://github.com/plotly/plotly.js/blob/master/src/plot_api/plot_config.js
+	serializer : string
+			JSON serializer used to export charts 
+			as html (asPlot=True) in offline mode
+				auto - orjson if it is installed, json otherwise
+				orjson - fast serializer with native NumPy support
+				json - plotly's default JSON encoder
 	datagen_mode : string
 			Mode in which the data is generated
 			by the datagen module
@@ -132,8 +244,17 @@ def set_config_file(sharing=None,theme=None,colorscale=None,offline=None,offline
 			Dictionary (l,r,b,t) or
 			Tuple containing the left,
 			right, bottom and top margins
+	backend : string
+			Sets the configuration backend for the 
+			current process (see set_backend)
+				file - `~/.cufflinks`
+				memory - configuration is only kept in memory 
+			The backend can also be set with the 
+			CUFFLINKS_CONFIG_BACKEND environment variable
 	"""
-	if not _file_permissions:
+	if backend:
+		set_backend(backend)
+	if _CONFIG_BACKEND == 'file' and not _file_permissions:
 		raise Exception("You don't have proper file permissions "
 									 "to run this function.")
 	valid_kwargs=['world_readable','dimensions','margin','offline_config']
@@ -170,11 +291,19 @@ def set_config_file(sharing=None,theme=None,colorscale=None,offline=None,offline
 		config['offline_link_text']=offline_link_text
 	if offline_config:
 		config['offline_config']=offline_config
+	if serializer:
+		if serializer not in ('auto','orjson','json'):
+			raise Exception("Invalid serializer : '{0}'".format(serializer))
+		config['serializer']=serializer
 	for _ in valid_kwargs:
 		if _ in kwargs:
 			config[_]=kwargs[_]
+	if _CONFIG_BACKEND == 'memory':
+		_MEMORY_CONTENT[CONFIG_FILE] = config
+		return
 	save_json_dict(CONFIG_FILE, config)
 	ensure_local_files()  
+	reload_config()
 
 
 def get_config_file(*args):
@@ -182,15 +311,52 @@ def get_config_file(*args):
     Return specified args from `~/.config`. as dict.
     Returns all if no arguments are specified.
 
+    The file is only read on first use or when it has 
+    been modified since it was last read. 
+    See reload_config() to force a new read.
+
     Example:
         get_config_file('sharing')
 
     """
-    if _file_permissions:
-        ensure_local_files()  
-        return load_json_dict(CONFIG_FILE, *args)
+    if _CONFIG_BACKEND == 'file' and _file_permissions:
+        config = _load_config()
+        if args:
+            return {key: copy.deepcopy(config[key]) for key in args if key in config}
+        return copy.deepcopy(config)
     else:
-        return _FILE_CONTENT[CONFIG_FILE]
+        return _get_content(CONFIG_FILE, *args)
+
+def reload_config():
+    """
+    Reads `~/.config` again, discarding the cached
+    configuration.
+    With the memory backend the configuration is reset
+    to the defaults and the environment variables.
+    """
+    _CONFIG_CACHE.clear()
+    _MEMORY_CONTENT.clear()
+    if _CONFIG_BACKEND == 'file' and _file_permissions:
+        _load_config()
+
+def _config_version():
+    try:
+        stat = os.stat(CONFIG_FILE)
+        return (stat.st_mtime, stat.st_size)
+    except OSError:
+        return None
+
+def _load_config():
+    """
+    Returns the cached configuration, reading `~/.config`
+    only if it has changed (mtime or size) since the last read.
+    """
+    version = _config_version()
+    if version is None or _CONFIG_CACHE.get('version') != version:
+        ensure_local_files()
+        _CONFIG_CACHE['config'] = load_json_dict(CONFIG_FILE)
+        _CONFIG_CACHE['version'] = _config_version()
+    return _CONFIG_CACHE['config']
 
 def get_user_colors(*args):
     """
@@ -201,11 +367,7 @@ def get_user_colors(*args):
         get_colors_file('blue')
 
     """
-    if _file_permissions:
-        ensure_local_files()  
-        return load_json_dict(COLORS_FILE, *args)
-    else:
-        return _FILE_CONTENT[COLORS_FILE]
+    return _get_content(COLORS_FILE, *args)
 
 def get_user_scales(*args):
     """
@@ -216,11 +378,7 @@ def get_user_scales(*args):
         get_scales_file('blues')
 
     """
-    if _file_permissions:
-        ensure_local_files()  
-        return load_json_dict(SCALES_FILE, *args)
-    else:
-        return _FILE_CONTENT[SCALES_FILE]
+    return _get_content(SCALES_FILE, *args)
 
 def get_user_themes(*args):
     """
@@ -231,11 +389,7 @@ def get_user_themes(*args):
         get_themes_file('solar')
 
     """
-    if _file_permissions:
-        ensure_local_files()  
-        return load_json_dict(THEMES_FILE, *args)
-    else:
-        return _FILE_CONTENT[THEMES_FILE]
+    return _get_content(THEMES_FILE, *args)
 
 def load_json_dict(filename, *args):
 	"""Checks if file exists. Returns {} if something fails."""
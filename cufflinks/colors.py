@@ -6,13 +6,18 @@ import numpy as np
 import colorsys
 import colorlover as cl
 import operator
-import copy
+import re
 
-from collections import deque
 from six import string_types
-from IPython.display import HTML, display
 
-from .utils import inverseDict
+try:
+    from functools import lru_cache
+except ImportError:
+    # Python 2: no memoization
+    def lru_cache(maxsize=None):
+        return lambda f: f
+
+from .utils import inverseDict, merge_dict
 from .auth import get_config_file
 
 
@@ -20,6 +25,73 @@ class CufflinksError(Exception):
     pass
 
 
+_RGB_RE = re.compile(r'^\s*(rgba?)\s*\(([^()]*)\)\s*$', re.IGNORECASE)
+_HEX_RE = re.compile(r'^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6})$')
+
+
+def _to_number(value):
+    value = value.strip()
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+@lru_cache(maxsize=1024)
+def _parse_color(color):
+    """
+    Parses a color string into a tuple of (kind, values)
+    where kind is one of rgb|rgba|hex and values is a
+    tuple of (r, g, b) or (r, g, b, a).
+    Returns None if the string is not an rgb|rgba|hex
+    color (i.e. it can be a color name).
+
+    Parameters:
+    -----------
+            color : string
+                    Color representation in rgba|rgb|hex
+    """
+    match = _RGB_RE.match(color)
+    if match:
+        kind = match.group(1).lower()
+        try:
+            values = tuple(_to_number(_) for _ in match.group(2).split(','))
+        except ValueError:
+            raise CufflinksError('Not a valid color: ' + color)
+        if len(values) != len(kind):
+            raise CufflinksError('Not a valid color: ' + color)
+        return kind, values
+    if _HEX_RE.match(color):
+        h = color[1:]
+        if len(h) == 3:
+            h = ''.join([x * 2 for x in h])
+        return 'hex', (int(h[0:2], base=16), int(h[2:4], base=16), int(h[4:6], base=16))
+    return None
+
+
+def _get_color(color):
+    """
+    Returns the parsed (kind, values) of a color,
+    resolving color names through cnames
+    """
+    parsed = _parse_color(color)
+    if parsed is None:
+        try:
+            parsed = _get_color(cnames[color.lower()])
+        except:
+            raise CufflinksError('Not a valid color: ' + color)
+    return parsed
+
+
+def _blend(values, bg=(255, 255, 255)):
+    a = values[3]
+    return tuple([int((1 - a) * bg[i] + a * values[i]) for i in range(3)])
+
+
+def _to_hex(values):
+    return '#' + ''.join(['{0:02x}'.format(x).upper() for x in values])
+
+
 def to_rgba(color, alpha):
     """
     Converts from hex|rgb to rgba
@@ -39,17 +111,15 @@ def to_rgba(color, alpha):
     """
     if type(color) == tuple:
         color, alpha = color
-    color = color.lower()
-    if 'rgba' in color:
-        cl = list(eval(color.replace('rgba', '')))
+    kind, values = _get_color(color)
+    if kind == 'rgba':
         if alpha:
-            cl[3] = alpha
-        return 'rgba' + str(tuple(cl))
-    elif 'rgb' in color:
-        r, g, b = eval(color.replace('rgb', ''))
-        return 'rgba' + str((r, g, b, alpha))
+            values = values[:3] + (alpha,)
+        return 'rgba' + str(values)
+    elif kind == 'rgb':
+        return 'rgba' + str(values + (alpha,))
     else:
-        return to_rgba(hex_to_rgb(color), alpha)
+        return 'rgba' + str(_get_color(normalize(color))[1] + (alpha,))
 
 
 def hex_to_rgb(color):
@@ -65,10 +135,7 @@ def hex_to_rgb(color):
             hex_to_rgb('#E1E5ED')
             hex_to_rgb('#f03')
     """
-    color = normalize(color)
-    color = color[1:]
-    # return 'rgb'+str(tuple(ord(c) for c in color.decode('hex')))
-    return 'rgb' + str((int(color[0:2], base=16), int(color[2:4], base=16), int(color[4:6], base=16)))
+    return 'rgb' + str(_get_color(normalize(color))[1])
 
 
 def normalize(color):
@@ -85,21 +152,20 @@ def normalize(color):
     """
     if type(color) == tuple:
         color = to_rgba(*color)
-    if 'rgba' in color:
-        return rgb_to_hex(rgba_to_rgb(color))
-    elif 'rgb' in color:
-        return rgb_to_hex(color)
-    elif '#' in color:
-        if len(color) == 7:
-            return color
-        else:
-            color = color[1:]
-            return '#' + ''.join([x * 2 for x in list(color)])
-    else:
+    parsed = _parse_color(color)
+    if parsed is None:
         try:
             return normalize(cnames[color.lower()])
         except:
             raise CufflinksError('Not a valid color: ' + color)
+    kind, values = parsed
+    if kind == 'hex':
+        if len(color) == 7:
+            return color
+        return '#' + ''.join([x * 2 for x in color[1:]])
+    if kind == 'rgba':
+        values = _blend(values)
+    return _to_hex(values)
 
 
 def rgb_to_hex(color):
@@ -114,9 +180,10 @@ def rgb_to_hex(color):
     Example:
             rgb_to_hex('rgb(23,25,24)')
     """
-    rgb = eval(color.replace('rgb', ''))
-    # return '#'+''.join(map(chr, rgb)).encode('hex')
-    return '#' + ''.join(['{0:02x}'.format(x).upper() for x in rgb])
+    kind, values = _get_color(color)
+    if kind == 'rgba':
+        values = _blend(values)
+    return _to_hex(values)
 
 
 def rgba_to_rgb(color, bg='rgb(255,255,255)'):
@@ -133,14 +200,10 @@ def rgba_to_rgb(color, bg='rgb(255,255,255)'):
     Example:
             rgba_to_rgb('rgb(23,25,24,.4)''
     """
-    def c_tup(c):
-        return eval(c[c.find('('):])
-    color = c_tup(color)
-    bg = hex_to_rgb(normalize(bg))
-    bg = c_tup(bg)
-    a = color[3]
-    r = [int((1 - a) * bg[i] + a * color[i]) for i in range(3)]
-    return 'rgb' + str(tuple(r))
+    kind, values = _get_color(color)
+    if kind == 'rgba':
+        values = _blend(values, _get_color(normalize(bg))[1])
+    return 'rgb' + str(values)
 
 
 def hex_to_hsv(color):
@@ -155,12 +218,8 @@ def hex_to_hsv(color):
     Example:
             hex_to_hsv('#ff9933')
     """
-    color = normalize(color)
-    color = color[1:]
-    # color=tuple(ord(c)/255.0 for c in color.decode('hex'))
-    color = (int(color[0:2], base=16) / 255.0, int(color[2:4],
-                                                   base=16) / 255.0, int(color[4:6], base=16) / 255.0)
-    return colorsys.rgb_to_hsv(*color)
+    r, g, b = _get_color(normalize(color))[1]
+    return colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)
 
 
 def color_range(color, N=20):
@@ -278,6 +337,7 @@ def color_table(color, N=1, sort=False, sort_values=False, inline=False, as_html
     s += '</ul>' if not inline else ''
     if as_html:
         return s
+    from IPython.display import HTML, display
     return display(HTML(s))
 
 
@@ -290,14 +350,50 @@ def colorgen(colors=None, n=None, scale=None, theme=None):
     -----------
             colors : list(colors)
                     List of colors to use
+            n : int
+                    Number of colors that will be consumed
+                    See get_palette()
 
     Example:
             colorgen()
             colorgen(['blue','red','pink'])
             colorgen(['#f03','rgb(23,25,25)'])
     """
+    for c in get_palette(colors, n, scale, theme):
+        yield c
+
+
+def get_palette(colors=None, n=None, scale=None, theme=None):
+    """
+    Returns a list of rgba colors for n series.
+
+    If n is up to 8 times the number of colors then these are
+    used in turn, rotating and fading them on each pass
+    (same sequence as previous versions of colorgen).
+    For more series the colors are interpolated in the CIELAB
+    space along the path given by the colors, so that each
+    series gets a distinct color and consecutive series are
+    far apart.
+    Palettes are cached by (colors, n).
+
+    Parameters:
+    -----------
+            colors : list(colors)
+                    List of colors to use
+            n : int
+                    Number of series
+            scale : str
+                    Color scale name
+                    Used when no colors are specified
+            theme : str
+                    Theme name, its colorscale is used
+                    when no colors or scale are specified
+
+    Example:
+            get_palette(scale='ggplot',n=3000)
+            get_palette(['blue','red','pink'],5)
+    """
     from .themes import THEMES
-    step = .1
     if not colors:
         if not scale:
             if not theme:
@@ -305,15 +401,90 @@ def colorgen(colors=None, n=None, scale=None, theme=None):
             else:
                 scale = THEMES[theme]['colorscale']
         colors = get_scales(scale)
-    dq = deque(colors)
-    if len(dq) == 0:
-        dq = deque(get_scales('ggplot'))
-    if n:
-        step = len(dq) * 0.8 / n if len(dq) * 8 < n else .1
-    for i in np.arange(.2, 1, step):
-        for y in dq:
-            yield to_rgba(y, 1 - i + .2)
-        dq.rotate(1)
+    colors = tuple(colors)
+    if len(colors) == 0:
+        colors = tuple(get_scales('ggplot'))
+    if n and n > _PALETTE_CACHE_MAX_N:
+        # one color per point (scatter3d) is not worth caching
+        return list(_make_palette(colors, n))
+    return list(_get_palette(colors, n))
+
+
+_PALETTE_CACHE_MAX_N = 1024
+
+
+def _make_palette(colors, n):
+    if n and len(colors) * 8 < n:
+        return _interp_palette(colors, n)
+    L = len(colors)
+    return tuple([to_rgba(colors[(j - r) % L], 1 - i + .2)
+                  for r, i in enumerate(np.arange(.2, 1, .1)) for j in range(L)])
+
+
+_get_palette = lru_cache(maxsize=128)(_make_palette)
+
+# offsets tried, nearest first, when two colors collide once rounded to 8 bits
+_NUDGES = sorted([(dr, dg, db) for dr in range(-2, 3) for dg in range(-2, 3) for db in range(-2, 3)],
+                 key=lambda d: (d[0] ** 2 + d[1] ** 2 + d[2] ** 2, d))
+
+
+def _interp_palette(colors, n):
+    lab = _rgb_to_lab(np.array([_get_color(normalize(c))[1] for c in colors], dtype=float))
+    if len(lab) == 1:
+        lab = np.array([[25.0] + list(lab[0, 1:]), lab[0], [90.0] + list(lab[0, 1:])])
+    # position of each color along the path, by perceptual distance
+    pos = np.concatenate([[0], np.cumsum(np.linalg.norm(np.diff(lab, axis=0), axis=1))])
+    pos = pos / pos[-1] if pos[-1] else np.linspace(0, 1, len(lab))
+    # low discrepancy (R2) sequence: path position and lightness offset
+    k = np.arange(n)
+    t = (0.5 + k * 0.7548776662466927) % 1
+    u = (0.5 + k * 0.5698402909980532) % 1
+    lab = np.column_stack([np.interp(t, pos, lab[:, i]) for i in range(3)])
+    lab[:, 0] = np.clip(lab[:, 0] + (u - .5) * 30, 0, 100)
+    # nudge colors that collide once rounded to 8 bits to a free neighbour,
+    # duplicates are kept once the whole neighbourhood is taken
+    palette, seen = [], set()
+    for color in _lab_to_rgb(lab).tolist():
+        if tuple(color) in seen:
+            for d in _NUDGES:
+                c = tuple(min(max(v + dv, 0), 255) for v, dv in zip(color, d))
+                if c not in seen:
+                    color = c
+                    break
+        r, g, b = color
+        seen.add((r, g, b))
+        palette.append('rgba({0}, {1}, {2}, 1.0)'.format(r, g, b))
+    return tuple(palette)
+
+
+_RGB_TO_XYZ = np.array([[0.4124564, 0.3575761, 0.1804375],
+                        [0.2126729, 0.7151522, 0.0721750],
+                        [0.0193339, 0.1191920, 0.9503041]])
+_XYZ_TO_RGB = np.linalg.inv(_RGB_TO_XYZ)
+_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+
+def _rgb_to_lab(rgb):
+    """
+    Converts an array of (r, g, b) 0-255 into CIELAB (D65)
+    """
+    c = rgb / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = c.dot(_RGB_TO_XYZ.T) / _WHITE
+    f = np.where(xyz > 216.0 / 24389, np.cbrt(xyz), (24389.0 / 27 * xyz + 16) / 116)
+    return np.column_stack([116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])])
+
+
+def _lab_to_rgb(lab):
+    """
+    Converts an array of CIELAB (D65) into (r, g, b) 0-255
+    """
+    fy = (lab[:, 0] + 16) / 116
+    f = np.column_stack([fy + lab[:, 1] / 500, fy, fy - lab[:, 2] / 200])
+    xyz = np.where(f ** 3 > 216.0 / 24389, f ** 3, (116 * f - 16) / (24389.0 / 27)) * _WHITE
+    c = xyz.dot(_XYZ_TO_RGB.T)
+    c = np.where(c > 0.0031308, 1.055 * np.power(np.clip(c, 0, None), 1 / 2.4) - 0.055, 12.92 * c)
+    return np.clip(np.round(c * 255), 0, 255).astype(int)
 
 # NEW STUFF
 
@@ -581,16 +752,96 @@ _custom_scales = {
 
 _scales = None
 _scales_names = None
+_user_scales = {}
+_scale_table = {}
 
 
-def interp(colors, N):
-    def _interp(colors, N):
-        try:
-            return cl.interp(colors, N)
-        except:
-            return _interp(colors, N + 1)
-    c = _interp(colors, N)
-    return list(map(rgb_to_hex, cl.to_rgb(c)))
+def interp(colors, N, space='hsl'):
+    """
+    Interpolates a list of colors into a scale of N colors (hex)
+
+    Parameters:
+    -----------
+            colors : list(colors)
+                    Color representation in rgba|rgb|hex or color names
+            N : int
+                    Number of colors to generate
+            space : string
+                    Color space in which the interpolation is done
+                            hsl : hue follows the shortest arc
+                            rgb
+                            lab : CIELAB, perceptually uniform
+
+    Example:
+            interp(['rgb(255,0,0)','rgb(0,0,255)'],5)
+            interp(['#f03','pearl'],10,space='lab')
+    """
+    return list(_interp(tuple(colors), N, space))
+
+
+@lru_cache(maxsize=128)
+def _interp(colors, N, space):
+    if space not in ('hsl', 'rgb', 'lab'):
+        raise CufflinksError("Invalid color space: '{0}'".format(space))
+    rgb = np.array([_get_color(normalize(c))[1] for c in colors], dtype=float)
+    if N < 1:
+        return ()
+    if len(rgb) == 1 or N == 1:
+        steps = np.array([(len(rgb) - 1) / 2.0] * N)
+    else:
+        steps = np.linspace(0, len(rgb) - 1, N)
+    if len(rgb) == 1:
+        rgb = np.vstack([rgb, rgb])
+    seg = np.minimum(np.floor(steps).astype(int), len(rgb) - 2)
+    f = (steps - seg)[:, None]
+    if space == 'lab':
+        lab = _rgb_to_lab(rgb)
+        values = _lab_to_rgb(lab[seg] + (lab[seg + 1] - lab[seg]) * f)
+    elif space == 'hsl':
+        hsl = _rgb_to_hsl(rgb)
+        h0, h1 = hsl[seg, 0], hsl[seg + 1, 0]
+        dh = h1 - h0
+        dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+        hsl = hsl[seg] + (hsl[seg + 1] - hsl[seg]) * f
+        hsl[:, 0] = (h0 + dh * f[:, 0]) % 360
+        values = _hsl_to_rgb(hsl)
+    else:
+        values = np.round(rgb[seg] + (rgb[seg + 1] - rgb[seg]) * f).astype(int)
+    return tuple([_to_hex(_) for _ in values.tolist()])
+
+
+def _rgb_to_hsl(rgb):
+    """
+    Converts an array of (r, g, b) 0-255 into (h, s, l)
+    with h in degrees and s, l in 0-1
+    """
+    c = rgb / 255.0
+    cmax, cmin = c.max(axis=1), c.min(axis=1)
+    delta = cmax - cmin
+    l = (cmax + cmin) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(delta == 0, 0, delta / (1 - np.abs(2 * l - 1)))
+        r, g, b = c[:, 0], c[:, 1], c[:, 2]
+        h = np.where(cmax == r, ((g - b) / delta) % 6,
+                     np.where(cmax == g, (b - r) / delta + 2, (r - g) / delta + 4))
+    h = np.where(delta == 0, 0, h * 60)
+    return np.column_stack([h, np.nan_to_num(s), l])
+
+
+def _hsl_to_rgb(hsl):
+    """
+    Converts an array of (h, s, l) into (r, g, b) 0-255
+    """
+    h, s, l = hsl[:, 0] / 60.0, hsl[:, 1], hsl[:, 2]
+    c = (1 - np.abs(2 * l - 1)) * s
+    x = c * (1 - np.abs(h % 2 - 1))
+    z = np.zeros(len(h))
+    sextant = np.floor(h).astype(int) % 6
+    rgb = np.choose(sextant[:, None], [np.column_stack(_) for _ in
+                                       [(c, x, z), (x, c, z), (z, c, x),
+                                        (z, x, c), (x, z, c), (c, z, x)]])
+    rgb = rgb + (l - c / 2)[:, None]
+    return np.clip(np.round(rgb * 255), 0, 255).astype(int)
 
 
 def scales(scale=None):
@@ -611,14 +862,15 @@ def scales(scale=None):
             scales('all')
             scales()
     """
+    from IPython.display import HTML, display
     if scale:
         if scale == 'all':
-            display(HTML(cl.to_html(_scales)))
+            display(HTML(cl.to_html(_get_scales()[0])))
         else:
             display(HTML(cl.to_html(get_scales(scale))))
     else:
         s = ''
-        keys = list(_scales_names.keys())
+        keys = list(_get_scales()[1].keys())
         keys.sort()
         for k in keys:
             scale = get_scales(k)
@@ -630,7 +882,13 @@ def scales(scale=None):
 # ---------------------------------
 
 
-def reset_scales():
+def _build_scales():
+    """
+    Builds the scale dictionaries from colorlover, the
+    custom scales and the user scales (~/.scales)
+            _scales : Type > Name > N
+            _scales_names : Name > N
+    """
     global _scales
     global _scales_names
     scale_cpy = cl.scales.copy()
@@ -665,6 +923,61 @@ def reset_scales():
                     _scales_names[k__] = {}
                 _scales_names[k__][k] = v__
 
+    # User scales can be given as Name > N or Name > list of colors
+    user_scales = {}
+    for k, v in list(_user_scales.items()):
+        user_scales[k.lower()] = v if isinstance(v, dict) else {str(len(v)): v}
+    _scales_names = merge_dict(_scales_names, user_scales)
+
+
+def _get_scales():
+    """
+    Returns the (_scales, _scales_names) dictionaries,
+    building them on first access
+    """
+    if _scales_names is None:
+        _build_scales()
+    return _scales, _scales_names
+
+
+def _get_scale(scale, n=None):
+    """
+    Returns a color scale as a tuple. Each (scale, n)
+    lookup is resolved once and kept in _scale_table.
+    """
+    key = (scale, n)
+    if key not in _scale_table:
+        is_reverse = False
+        name = scale
+        if name[0] == '-':
+            name = name[1:]
+            is_reverse = True
+        d = _get_scales()[1][name.lower()]
+        keys = list(map(int, list(d.keys())))
+        cs = None
+        if n:
+            if n in keys:
+                cs = d[str(n)]
+            elif n < min(keys):
+                cs = d[str(min(keys))]
+        if cs is None:
+            cs = d[str(max(keys))]
+        cs = tuple(cs)
+        _scale_table[key] = cs[::-1] if is_reverse else cs
+    return _scale_table[key]
+
+
+def reset_scales():
+    """
+    Clears the color scale tables.
+    These are rebuilt on the next scale lookup.
+    """
+    global _scales
+    global _scales_names
+    _scales = None
+    _scales_names = None
+    _scale_table.clear()
+
 
 def get_scales(scale=None, n=None):
     """
@@ -688,29 +1001,13 @@ def get_scales(scale=None, n=None):
             get_scales('pastel1')
     """
     if scale:
-        is_reverse = False
-        if scale[0] == '-':
-            scale = scale[1:]
-            is_reverse = True
-        d = copy.deepcopy(_scales_names[scale.lower()])
-        keys = list(map(int, list(d.keys())))
-        cs = None
-        if n:
-            if n in keys:
-                cs = d[str(n)]
-            elif n < min(keys):
-                cs = d[str(min(keys))]
-        if cs is None:
-            cs = d[str(max(keys))]
-        if is_reverse:
-            cs.reverse()
-        return cs
+        return list(_get_scale(scale, n))
     else:
         d = {}
-        for k, v in list(_scales_names.items()):
+        for k, v in list(_get_scales()[1].items()):
             if isinstance(v, dict):
                 keys = list(map(int, list(v.keys())))
-                d[k] = v[str(max(keys))]
+                d[k] = list(v[str(max(keys))])
             else:
                 d[k] = v
         return d
@@ -745,4 +1042,84 @@ def get_colorscale(scale):
     return cs
 
 
-reset_scales()
+def _value_range(values, vmin=None, vmax=None):
+    if values.size and not np.isnan(values).all():
+        vmin = float(np.nanmin(values)) if vmin is None else vmin
+        vmax = float(np.nanmax(values)) if vmax is None else vmax
+    vmin = 0.0 if vmin is None else vmin
+    vmax = vmin + 1.0 if vmax is None else vmax
+    return vmin, vmax
+
+
+def map_values(values, scale=None, vmin=None, vmax=None):
+    """
+    Maps an array of values through a color scale.
+    Returns an array of shape (len(values), 4) with the
+    red, green, blue (0-255) and alpha (0-1) components;
+    NaN values are mapped to transparent.
+
+    Parameters:
+    -----------
+            values : array
+                    Values to map
+            scale : str or list
+                    Color scale name or list of colors (rgb,rgba,hex)
+                    If not specified the default colorscale is used
+            vmin : float
+                    Value mapped to the first color of the scale
+                    Default: min(values)
+            vmax : float
+                    Value mapped to the last color of the scale
+                    Default: max(values)
+
+    Example:
+            map_values(df['volume'].values,'blues')
+            map_values([0,.5,1],['red','blue'],vmin=0,vmax=1)
+    """
+    values = np.asarray(values, dtype=float).ravel()
+    vmin, vmax = _value_range(values, vmin, vmax)
+    stops = []
+    for _, c in get_colorscale(scale if scale else get_config_file()['colorscale']):
+        kind, rgba = _get_color(c)
+        stops.append(rgba if kind == 'rgba' else rgba + (1.0,))
+    stops = np.array(stops, dtype=float)
+    if vmax > vmin:
+        t = np.clip((values - vmin) / (vmax - vmin), 0, 1)
+    else:
+        t = np.zeros(len(values))
+    pos = np.linspace(0, 1, len(stops))
+    rgba = np.column_stack([np.interp(t, pos, stops[:, i]) for i in range(4)])
+    rgba[np.isnan(values)] = 0
+    return rgba
+
+
+def get_marker_colors(values, scale=None, vmin=None, vmax=None):
+    """
+    Returns the marker properties (color, colorscale, cmin
+    and cmax) that colour each point by its value.
+    The values are passed as a numeric array and plotly.js
+    applies the colorscale, so no per point color strings
+    are built.
+
+    Parameters:
+    -----------
+            values : array
+                    Values to map
+            scale : str or list
+                    Color scale name or list of colors (rgb,rgba,hex)
+                    If not specified the default colorscale is used
+            vmin : float
+                    Value mapped to the first color of the scale
+                    Default: min(values)
+            vmax : float
+                    Value mapped to the last color of the scale
+                    Default: max(values)
+
+    Example:
+            get_marker_colors(df['z'].values,'rdbu')
+            get_marker_colors(is_up,['red','green'],0,1)
+    """
+    values = np.asarray(values, dtype=float)
+    vmin, vmax = _value_range(values, vmin, vmax)
+    return dict(color=values, cmin=vmin, cmax=vmax,
+                colorscale=get_colorscale(scale if scale else get_config_file()['colorscale']))
@@ -1,7 +1,25 @@
-import plotly.offline as py_offline
+import sys
 
 ### Offline Mode	
 
+_OFFLINE_INITIALIZED=False
+
+def _plotly_offline():
+	"""
+	Returns the plotly.offline module, importing it on first use
+	as it pulls plotly.tools and IPython along with it.
+	"""
+	import plotly.offline as py_offline
+	return py_offline
+
+if sys.version_info >= (3,7):
+	def __getattr__(name):
+		if name=='py_offline':
+			return _plotly_offline()
+		raise AttributeError("module '{0}' has no attribute '{1}'".format(__name__,name))
+else:
+	import plotly.offline as py_offline
+
 def run_from_ipython():
     try:
         __IPYTHON__
@@ -23,19 +41,22 @@ def go_offline(connected=None):
             connected=True if get_config_file()['offline_connected'] is None else get_config_file()['offline_connected']
         except:
             connected=True
+    global _OFFLINE_INITIALIZED
     if run_from_ipython():
+        py_offline=_plotly_offline()
         try:
             py_offline.init_notebook_mode(connected)
         except TypeError:
             #For older versions of plotly
             py_offline.init_notebook_mode()
-    py_offline.__PLOTLY_OFFLINE_INITIALIZED=True
+    _OFFLINE_INITIALIZED=True
 
 def go_online():
-	py_offline.__PLOTLY_OFFLINE_INITIALIZED=False
+	global _OFFLINE_INITIALIZED
+	_OFFLINE_INITIALIZED=False
 
 def is_offline():
-	return py_offline.__PLOTLY_OFFLINE_INITIALIZED
+	return _OFFLINE_INITIALIZED
 
 def upgrade(url=None):
 	from .auth import get_config_file
@@ -46,4 +67,72 @@ def upgrade(url=None):
 							"the default offline URL.")
 		else:
 			url=get_config_file()['offline_url']
-	py_offline.download_plotlyjs(url)
+	_plotly_offline().download_plotlyjs(url)
+
+__HTML_TEMPLATE = """<html>
+<head><meta charset="utf-8" /></head>
+<body>
+    <div>
+        {plotlyjs}
+        <div id="{div_id}" class="plotly-graph-div" style="height:100%; width:100%;"></div>
+        <script type="text/javascript">
+            window.PLOTLYENV=window.PLOTLYENV || {{}};
+            if (document.getElementById("{div_id}")) {{
+                var figure = {figure};
+                Plotly.newPlot("{div_id}", figure.data, figure.layout, {config});
+            }};
+        </script>
+    </div>
+</body>
+</html>"""
+
+def write_html(figure,filename='temp-plot.html',show_link=False,link_text='Export to plot.ly',
+			   config=None,auto_open=True,serializer=None):
+	"""
+	Writes a figure as a standalone html file and returns
+	the url of the file.
+	The figure is serialized with the cufflinks serializer
+	See cufflinks.tools.to_json()
+
+	Parameters:
+	-----------
+		figure : Figure or dict
+			Plotly figure
+		filename : string
+			Name of the html file
+		show_link : bool
+			If true then the chart will show a link to 
+			plot.ly at the bottom right of the chart 
+		link_text : string
+			Text to display as link at the bottom 
+			right of the chart 
+		config : dict
+			plotly.js configuration options
+		auto_open : bool
+			If True then the file is opened in a web browser
+		serializer : string
+			auto : orjson if it is installed, json otherwise
+			orjson
+			json
+	"""
+	import io
+	import os
+	import uuid
+	import webbrowser
+	from .tools import to_json
+	config=dict(config) if config else {}
+	config.setdefault('showLink',show_link)
+	config.setdefault('linkText',link_text)
+	html=__HTML_TEMPLATE.format(
+		plotlyjs='<script type="text/javascript">{0}</script>'.format(_plotly_offline().get_plotlyjs()),
+		div_id=str(uuid.uuid4()),
+		figure=to_json(figure,serializer).replace('</','<\\/'),
+		config=to_json(config,serializer))
+	if not filename.endswith('.html'):
+		filename+='.html'
+	with io.open(filename,'w',encoding='utf-8') as f:
+		f.write(html)
+	url='file://'+os.path.abspath(filename)
+	if auto_open:
+		webbrowser.open(url)
+	return url
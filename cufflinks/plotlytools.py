@@ -3,13 +3,11 @@ import time
 import copy
 import numpy as np
 # from plotly.graph_objs import *
-from plotly.graph_objs import Figure, Layout, Bar, Box, Scatter, FigureWidget, Scatter3d, Histogram, Heatmap, Surface, Pie
-import plotly.figure_factory as ff
+from plotly.graph_objs import Figure, Layout, Bar, Box, Scatter, Scatter3d, Histogram, Heatmap, Surface, Pie
 from collections import defaultdict
-from IPython.display import display,Image
 from .exceptions import CufflinksError
-from .colors import normalize,get_scales,colorgen,to_rgba,get_colorscale
-from .utils import check_kwargs, deep_update, kwargs_from_keyword, is_list
+from .colors import normalize,get_scales,get_palette,to_rgba,get_colorscale,get_marker_colors
+from .utils import check_kwargs, deep_update, kwargs_from_keyword
 from . import tools 
 from . import offline
 from . import auth
@@ -506,6 +504,15 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 		Line, Scatter
 			connectgaps : bool
 				If True, empty values are connected 
+		Bubble
+			abs_size : bool
+				If True then the values of the 'size' column
+				are used as the marker sizes. Otherwise 
+				they are scaled between 12 and 112
+			colorby : string
+				Name of the column whose values are mapped 
+				to the marker colors through the colorscale
+				* Only valid when kind is 'bubble' or 'bubble3d'
 		Pie charts
 			sort : bool
 				If True it sorts the labels by value
@@ -536,6 +543,43 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 		Histogram
 			linecolor : string
 				specifies the line color of the histogram
+			prebin : bool
+				If True then the bins are computed locally and 
+				only the height of each bin is sent to plotly.js
+				(as bars). Recommended for large DataFrames. 
+				Bins are shared across all columns and follow 
+				the 'bins' and 'histnorm' parameters. 
+				When 'bins' is not set the bin size follows
+				Sturges' rule, which can differ from plotly.js' 
+				autobin.
+
+		Box
+			precompute : bool
+				If True then the quartiles, fences and mean 
+				are computed locally and only these statistics
+				(plus the sample points set by 'boxpoints') are 
+				sent to plotly.js. Recommended for large DataFrames.
+			max_points : int
+				Maximum number of sample points displayed
+				for each box when precompute=True.
+				Default : 1000
+
+		OHLC and Candlestick
+			max_bars : int
+				Maximum number of bars to be displayed.
+				If the DataFrame has more bars then these are
+				aggregated to the smallest frequency that fits
+				(open=first, high=max, low=min, close=last, volume=sum)
+				Only valid for a DatetimeIndex
+
+		Spread and Ratio
+			spread_base : string
+				Name of the column against which every 
+				other column is compared 
+					spread : column - spread_base
+					ratio : column / spread_base
+				If not specified then the first column is 
+				compared against the second one.
 
 		Heatmap and Surface
 			center_scale : float
@@ -547,6 +591,22 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 			zmax : float
 				Defines the maximum range for the z values. 
 				This affects the range for the colorscale
+			max_cells : int or tuple
+				Maximum number of cells along each axis.
+				Larger matrices are reduced by aggregating
+				blocks of adjacent cells.
+				if int:
+					applies to both axes
+				if tuple:
+					(rows, columns)
+				When 'z' is specified the x, y and z values
+				are first arranged into a grid
+			cellfunc : string
+				Function used to aggregate each block of cells
+				when max_cells is set
+					mean
+					max
+					min
 
 		Error Bars
 			error_trace : string
@@ -663,25 +723,38 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 			scale : integer
 				Increase the resolution of the image by `scale` amount
 				Only valid when asImage=True		
+			encoding : string
+				If 'base64' then the numeric data arrays are
+				encoded as plotly.js typed arrays, which reduces
+				the size of the figure and its parsing time.
+				When asFigure=True a dict is returned instead of
+				a Figure.
+				Requires plotly.js 2.28 or above; with an older
+				plotly.js a warning is issued and the arrays
+				are not encoded
 	"""
 
 	# Valid Kwargs
 	valid_kwargs = ['color','opacity','column','columns','labels','text','world_readable','colorbar']
-	BUBBLE_KWARGS = ['abs_size']
+	BUBBLE_KWARGS = ['abs_size','colorby']
 	TRACE_KWARGS = ['hoverinfo','connectgaps']
-	HEATMAP_SURFACE_KWARGS = ['center_scale','zmin','zmax']
+	HEATMAP_SURFACE_KWARGS = ['center_scale','zmin','zmax','max_cells','cellfunc']
 	PIE_KWARGS=['sort','pull','hole','textposition','textinfo','linecolor','linewidth','textcolor']
-	OHLC_KWARGS=['up_color','down_color','open','high','low','close','volume','name','decreasing','increasing']
+	OHLC_KWARGS=['up_color','down_color','open','high','low','close','volume','name','decreasing','increasing',
+				 'max_bars']
+	SPREAD_KWARGS=['spread_base']
+	HISTOGRAM_KWARGS=['prebin']
+	BOX_KWARGS=['precompute','max_points']
 	SUBPLOT_KWARGS=['horizontal_spacing', 'vertical_spacing',
 					'specs', 'insets','start_cell','shared_xaxes','shared_yaxes','subplot_titles','shared_xaxis','shared_yaxis']
 	GEO_KWARGS=['locationmode','locationsrc','geo','lon','lat']
 	ERROR_KWARGS=['error_trace','error_values_minus','error_color','error_thickness',
 					'error_width','error_opacity']
-	EXPORT_KWARGS=['display_image','scale']
+	EXPORT_KWARGS=['display_image','scale','encoding']
 	FF_DISTPLOT=["group_labels", "bin_size", "curve_type", "rug_text", "show_hist", "show_curve", "show_rug"]
 	FF_VIOLIN=["data_header","group_header","show_rug","sort"]
 	kwargs_list = [tools.__LAYOUT_KWARGS,BUBBLE_KWARGS,TRACE_KWARGS,
-				   OHLC_KWARGS,PIE_KWARGS,HEATMAP_SURFACE_KWARGS,SUBPLOT_KWARGS,GEO_KWARGS,ERROR_KWARGS,EXPORT_KWARGS,
+				   OHLC_KWARGS,SPREAD_KWARGS,HISTOGRAM_KWARGS,BOX_KWARGS,PIE_KWARGS,HEATMAP_SURFACE_KWARGS,SUBPLOT_KWARGS,GEO_KWARGS,ERROR_KWARGS,EXPORT_KWARGS,
 				   FF_DISTPLOT,FF_VIOLIN]
 	[valid_kwargs.extend(_) for _ in kwargs_list]
 
@@ -736,8 +809,9 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 				if 'linecolor' in kwargs:
 					linecolor=kwargs.get('linecolor')
 				else:
-					if 'linecolor' in tools.getTheme(theme=theme):
-						linecolor=normalize(tools.getTheme(theme=theme)['linecolor'])
+					theme_data=tools.getTheme(theme=theme)
+					if 'linecolor' in theme_data:
+						linecolor=normalize(theme_data['linecolor'])
 					else: 
 						linecolor=tools.getLayout(theme=theme)['xaxis']['titlefont']['color']
 				dict_modifiers['line']['color']=linecolor			
@@ -773,36 +847,46 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 						asDates=asDates,mode=mode,symbol=symbol,size=size,text=text,barmode=barmode,orientation=orientation)
 				data=fig['data']			
 			else:
-				_keys=pd.unique(self[categories])
+				# Single pass partition: rows are sorted by category code once and 
+				# each category is then a contiguous slice of the sorted columns
+				codes,_keys=pd.factorize(self[categories])
+				_keys=list(_keys)
+				order=np.argsort(codes,kind='mergesort')
+				bounds=np.searchsorted(codes[order],np.arange(len(_keys)+1))
+				def _column(col):
+					values=self[col].iloc[order]
+					return values if asFrame else values.values
+				def _slice(values,i):
+					if isinstance(values,pd.Series):
+						return values.iloc[bounds[i]:bounds[i+1]]
+					return values[bounds[i]:bounds[i+1]]
 				colors=get_colors(colors,colorscale,_keys)	
 				mode='markers' if not mode else mode
-				for _ in _keys:
-					__=self[self[categories]==_].copy()
+				textfont=tools.getLayout(theme=theme)['xaxis']['titlefont']
+				if text:
+					texts=_column(text)
+				xs=_column(x)
+				ys=_column(y)
+				if z:
+					zs=_column(z)
+				if 'bubble' in kind:
+					sizes=tools.get_bubble_sizes(self[size].values,kwargs.get('abs_size',False))[order]
+				for i,_ in enumerate(_keys):
 					if text:
-						_text=__[text] if asFrame else __[text].values
-					_x=__[x] if asFrame else __[x].values
-					_y=__[y] if asFrame else __[y].values
+						_text=_slice(texts,i)
+					_x=_slice(xs,i)
+					_y=_slice(ys,i)
 					if z:
-						_z=__[z] if asFrame else __[z].values
+						_z=_slice(zs,i)
 					if 'bubble' in kind:
-						rg=__[size].values
-						rgo=self[size].values
-						if not kwargs.get('abs_size',False):
-							if len(rgo)>1:
-								_size=[int(100*(float(i)-rgo.min( ))/(rgo.max()-rgo.min()))+12 for i in rg]		
-							else:
-								_size=[12] if len(rgo) else []
-						else:
-							_size=rgo
+						_size=_slice(sizes,i)
 					else:
 						_size=size
-					_data=Scatter3d(x=_x,y=_y,mode=mode,name=_,
-								marker=dict(color=colors[_],symbol=symbol,size=_size,opacity=opacity,
-												line=dict(width=width)),textfont=tools.getLayout(theme=theme)['xaxis']['titlefont'])
+					marker=dict(color=colors[_],symbol=symbol,size=_size,opacity=opacity,
+								line=dict(width=width))
 					if '3d' in kind:
 						_data=Scatter3d(x=_x,y=_y,z=_z,mode=mode,name=_,
-								marker=dict(color=colors[_],symbol=symbol,size=_size,opacity=opacity,
-												line=dict(width=width)),textfont=tools.getLayout(theme=theme)['xaxis']['titlefont'])
+								marker=marker,textfont=textfont)
 					else:
 						#see error 168
 						if type(_x)==np.ndarray:
@@ -813,8 +897,7 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 								_y=_y.astype(str)
 						
 						_data=Scatter(x=_x,y=_y,mode=mode,name=_,
-								marker=dict(color=colors[_],symbol=symbol,size=_size,opacity=opacity,
-												line=dict(width=width)),textfont=tools.getLayout(theme=theme)['xaxis']['titlefont'])
+								marker=marker,textfont=textfont)
 					if text:
 						_data.update(text=_text)
 					data.append(_data)
@@ -845,20 +928,44 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 					trace.update(**trace_kw)		
 						
 				if kind in ('spread','ratio'):
-						if kind=='spread':
-							trace=self.apply(lambda x:x[0]-x[1],axis=1)
-							positive=trace.apply(lambda x:x if x>=0 else np.nan)
-							negative=trace.apply(lambda x:x if x<0 else np.nan)
-							trace=pd.DataFrame({'positive':positive,'negative':negative})
-							trace=trace.to_iplot(colors={'positive':'green','negative':'red'},width=0.5)
+						if kwargs.get('spread_base',None):
+							base=kwargs['spread_base']
+							if base not in self:
+								raise CufflinksError('Column "{0}" not found in DataFrame'.format(base))
+							cols=[_ for _ in self.columns if _!=base]
 						else:
-							trace=self.apply(lambda x:x[0]*1.0/x[1],axis=1).to_iplot(colors=['green'],width=1)
-						for t in trace:
-							t.update({'xaxis':'x2','yaxis':'y2','fill':'tozeroy',
-											'name':kind.capitalize(),'connectgaps':False,'showlegend':False})
-						data.append(trace[0])
+							base=self.columns[1]
+							cols=list(self.columns[:1])
+						values=self[cols].astype(float)
 						if kind=='spread':
-							data.append(trace[1])
+							values=values.sub(self[base],axis=0)
+						else:
+							values=values.div(self[base],axis=0)
+						line_colors=dict([(t['name'],t['line']['color']) for t in data if 'line' in t])
+						for col in values.columns:
+							if len(cols)==1:
+								name=kind.capitalize()
+							else:
+								name='{0}({1})'.format(kind.capitalize(),col)
+							color='green' if len(cols)==1 else line_colors.get(str(col),'green')
+							if kind=='spread':
+								trace=pd.DataFrame({'positive':values[col].where(values[col]>=0),
+													'negative':values[col].where(values[col]<0)})
+								# a single spread keeps green/red, several spreads
+								# use the colour of their column (lighter when negative)
+								if len(cols)==1:
+									trace=trace.to_iplot(colors={'positive':'green','negative':'red'},width=0.5)
+								else:
+									fills={'positive':to_rgba(color,.5),'negative':to_rgba(color,.15)}
+									trace=trace.to_iplot(colors=[color,color],width=0.5)
+									for t in trace:
+										t.update(fillcolor=fills[t['name']])
+							else:
+								trace=values[col].to_iplot(colors=[color],width=1)
+							for t in trace:
+								t.update({'xaxis':'x2','yaxis':'y2','fill':'tozeroy',
+												'name':name,'connectgaps':False,'showlegend':False})
+							data.extend(trace)
 						layout['yaxis'].update({'domain':[.3,1]})
 						layout['yaxis2']=copy.deepcopy(layout['yaxis'])
 						layout['xaxis2']=copy.deepcopy(layout['xaxis'])
@@ -879,21 +986,20 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 				x=self[x].values.tolist()
 				y=self[y].values.tolist()
 				z=size if size else z
-				rg=self[z].values
-				if not kwargs.get('abs_size',False):
-					if len(rg) > 1:
-						z=[int(100*(float(_)-rg.min())/(rg.max()-rg.min()))+12 for _ in rg]
-					else:
-						z=[12] if len(rg) else []
-				else:
-					z=rg
+				z=tools.get_bubble_sizes(self[z].values,kwargs.get('abs_size',False))
 				text=kwargs['labels'] if 'labels' in kwargs else text
 				labels=self[text].values.tolist() if text else ''
-				clrs=colors if colors else get_scales(colorscale)
-				clrs=[clrs] if not isinstance(clrs,list) else clrs
-				clrs=[clrs[0]]*len(x) if len(clrs)==1 else clrs
+				if kwargs.get('colorby',None):
+					clrs=self[kwargs['colorby']].values
+				else:
+					clrs=colors if colors else get_scales(colorscale)
+					clrs=[clrs] if not isinstance(clrs,list) else clrs
+					clrs=clrs[0] if len(clrs)==1 else clrs
 				marker=dict(color=clrs,size=z,symbol=symbol,
 								line=dict(width=width))
+				if kwargs.get('colorby',None):
+					marker.update(get_marker_colors(clrs,colorscale),showscale=True,
+								  colorbar=dict(title=kwargs['colorby']))
 				trace=Scatter(x=x,y=y,marker=marker,mode='markers',text=labels)
 				data=[trace]
 			elif kind in ('box','histogram','hist'):
@@ -907,8 +1013,25 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 					barmode = 'overlay' if barmode=='' else	 barmode 
 					layout.update(barmode=barmode) 
 				columns=keys if keys else df.columns
+				prebinned={}
+				if 'hist' in kind and kwargs.get('prebin',False):
+					for _ in columns:
+						if df[_].dtype.kind in 'iuf':
+							values=df[_].values
+							prebinned[_]=values[np.isfinite(values)]
+					edges=tools.get_bin_edges(list(prebinned.values()),bins)
 				for _ in columns:
-					if kind=='box':
+					if kind=='box' and kwargs.get('precompute',False) and df[_].dtype.kind in 'iuf':
+						stats,values=tools.get_box_stats(df[_].values,boxpoints,kwargs.get('max_points',1000))
+						# the sample points are passed along with the statistics
+						# so plotly.js positions, jitters and highlights them
+						__=Box(x=[_],y=[values] if len(values) else None,
+								marker=dict(color=clrs[_]),name=_,
+								line=dict(width=width),boxpoints=boxpoints or False,**stats)
+						__['orientation']=orientation
+						if orientation=='h':
+							__['x'],__['y']=__['y'],__['x']
+					elif kind=='box':
 						__=Box(y=df[_].values.tolist(),marker=dict(color=clrs[_]),name=_,
 								line=dict(width=width),boxpoints=boxpoints)
 						# 114 - Horizontal Box
@@ -916,6 +1039,18 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 						if orientation=='h':
 							__['x'],__['y']=__['y'],__['x']	
 						
+					elif _ in prebinned:
+						__=dict(x=(edges[:-1]+edges[1:])/2,y=tools.get_histogram(prebinned[_],edges,histnorm),
+								width=np.diff(edges)*(1-bargap if bargap else 1),name=_,
+								marker=dict(color=clrs[_], line=dict(width=width)),
+								orientation=orientation,
+								opacity=kwargs['opacity'] if 'opacity' in kwargs else .8)
+
+						__['marker']=get_marker(__['marker'])
+
+						if orientation=='h':
+							__['x'],__['y']=__['y'],__['x']
+						__ = Bar(__)
 					else:
 						__=dict(x=df[_].values.tolist(),name=_,
 								marker=dict(color=clrs[_], line=dict(width=width)),
@@ -955,18 +1090,28 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 					else:
 						x=self.index.values.tolist()
 				y=self[y].values.tolist() if y else self.columns.values.tolist()
-				z=self[z].values.tolist() if z else self.values.transpose()
+				if z:
+					z=self[z].values
+					if kwargs.get('max_cells',None):
+						# the x, y and z values are gridded before being reduced
+						grid=pd.DataFrame({'x':x,'y':y,'z':z}).pivot_table(index='y',columns='x',
+																		 values='z',aggfunc='last')
+						z=np.ascontiguousarray(grid.values)
+						x=grid.columns.values.tolist()
+						y=grid.index.values.tolist()
+				else:
+					z=np.ascontiguousarray(self.values.transpose())
+				if kwargs.get('max_cells',None):
+					z,(rows,cols)=tools.reduce_matrix(z,kwargs['max_cells'],kwargs.get('cellfunc','mean'))
+					x=x[::cols]
+					y=y[::rows]
 				scale=get_scales('rdbu') if not colorscale else get_scales(colorscale)
 				scale=[normalize(_) for _ in scale]
 				colorscale=[[float(_)/(len(scale)-1),scale[_]] for _ in range(len(scale))]
 				center_scale = kwargs.get('center_scale',None)
 				
-				if is_list(z):				
-					zmin=min(z)
-					zmax=max(z)
-				else:
-					zmin=z.min()
-					zmax=z.max()
+				zmin=float(np.nanmin(z))
+				zmax=float(np.nanmax(z))
 					
 				if center_scale is not None:
 					if center_scale<=zmin+(zmax-zmin)/2:
@@ -983,21 +1128,18 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 			elif kind in ('scatter3d','bubble3d'):
 				data=[]
 				keys=self[text].values if text else list(range(len(self)))
-				colors=get_colors(colors,colorscale,keys,asList=True)
 				mode='markers' if 'markers' not in mode else mode 
-				df=self.copy()
-				df['index']=keys
 				if kind=='bubble3d':
-					rg=self[size].values
-					if not kwargs.get('abs_size',False):
-						size=[int(100*(float(_)-rg.min())/(rg.max()-rg.min()))+12 for _ in rg]
-					else:
-						size=rg
+					size=tools.get_bubble_sizes(self[size].values,kwargs.get('abs_size',False))
+				marker=dict(symbol=symbol,size=size,opacity=.8)
+				if kwargs.get('colorby',None):
+					marker.update(get_marker_colors(self[kwargs['colorby']].values,colorscale),
+								  showscale=True,colorbar=dict(title=kwargs['colorby']))
 				else:
-					size=[size for _ in range(len(keys))]	
+					marker.update(color=get_colors(colors,colorscale,keys,asList=True))
 
-				_data=Scatter3d(x=df[x].values.tolist(),y=df[y].values.tolist(),z=df[z].values.tolist(),mode=mode,text=keys,
-									marker=dict(color=colors,symbol=symbol,size=size,opacity=.8))
+				_data=Scatter3d(x=self[x].values,y=self[y].values,z=self[z].values,mode=mode,text=keys,
+									marker=marker)
 				if text:
 					_data.update(text=keys)
 				data.append(_data)
@@ -1041,16 +1183,20 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 			elif kind in ('candle','ohlc','candlestick'):
 				kind='candlestick' if kind=='candle' else kind
 				kw=check_kwargs(kwargs,OHLC_KWARGS)
+				max_bars=kw.pop('max_bars',None)
 				d=ta._ohlc_dict(self,validate='ohlc',**kw)
+				df=self
+				if isinstance(df.index,pd.core.indexes.datetimes.DatetimeIndex):
+					if max_bars:
+						rule=tools.get_ohlc_rule(df.index,max_bars)
+						if rule:
+							df=tools.resample_ohlc(df,rule,d)
 				_d=dict(type=kind,
-							open=self[d['open']].values.tolist(),
-							high=self[d['high']].values.tolist(),
-							low=self[d['low']].values.tolist(),
-							close=self[d['close']].values.tolist())
-				if isinstance(self.index,pd.core.indexes.datetimes.DatetimeIndex):
-					_d['x']=self.index.astype('str')
-				else:
-					_d['x']=self.index
+							open=df[d['open']].values,
+							high=df[d['high']].values,
+							low=df[d['low']].values,
+							close=df[d['close']].values)
+				_d['x']=tools._index_strings(df.index)
 				if 'name' in kw:
 					_d['name']=kw['name']
 				
@@ -1108,6 +1254,7 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 				group_labels=kw.pop('group_labels',self.columns)
 				if histnorm:
 					kw['histnorm']=histnorm
+				import plotly.figure_factory as ff
 				fig=ff.create_distplot(hist_data=hist_data,group_labels=group_labels,
 										 colors=colors,**kw).to_dict()
 				data=fig['data']
@@ -1142,6 +1289,7 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 					elif len(df.columns)>1:
 						if 'data_header' not in kw:
 							raise CufflinksError('data_header must be the column name with the desired numeric data for the violin plot.')
+				import plotly.figure_factory as ff
 				fig=ff.create_violin(df,**kw).to_dict()
 				data=fig['data']
 				layout=tools.merge_dict(layout,fig['layout'])
@@ -1213,11 +1361,14 @@ def _iplot(self,kind='scatter',data=None,layout=None,filename='',sharing=None,ti
 	validate = False if 'shapes' in layout else validate
 
 	if asFigure:
+		if kwargs.get('encoding',None):
+			return tools.encode_figure(Figure(figure),kwargs['encoding'])
 		return Figure(figure)
 	else:
 		return iplot(figure,validate=validate,sharing=sharing,filename=filename,
 			 online=online,asImage=asImage,asUrl=asUrl,asPlot=asPlot,
-			 dimensions=dimensions,display_image=kwargs.get('display_image',True))
+			 dimensions=dimensions,display_image=kwargs.get('display_image',True),
+			 encoding=kwargs.get('encoding',None))
 	
 
 def get_colors(colors,colorscale,keys,asList=False):
@@ -1225,13 +1376,11 @@ def get_colors(colors,colorscale,keys,asList=False):
 			if not colors:
 				if colorscale:
 					colors=get_scales(colorscale,len(keys))
-			clrgen=colorgen(colors,len(keys))
+			palette=get_palette(colors,len(keys))
 			if asList:
-				colors=[next(clrgen) for _ in keys]
+				colors=palette[:len(keys)]
 			else:
-				colors={}
-				for key in keys:
-					colors[key]=next(clrgen)
+				colors=dict(zip(keys,palette))
 	return colors
 
 def get_items_as_list(items,keys,items_names='styles'):
@@ -1258,7 +1407,7 @@ def get_items_as_list(items,keys,items_names='styles'):
 	return items
 
 
-def _scatter_matrix(self,theme=None,bins=10,color='grey',size=2, asFigure=False, **iplot_kwargs):
+def _scatter_matrix(self,theme=None,bins=10,color='grey',size=2,splom=False,max_rows=None,asFigure=False,**iplot_kwargs):
 	"""
 	Displays a matrix with scatter plot for each pair of 
 	Series in the DataFrame.
@@ -1276,10 +1425,20 @@ def _scatter_matrix(self,theme=None,bins=10,color='grey',size=2, asFigure=False,
 			Color to be used for each scatter plot
 		size : int
 			Size for each marker on the scatter plot
+		splom : bool
+			If True then all the scatter plots are drawn
+			by a single plotly splom trace and the 
+			histograms are binned locally.
+			Recommended for DataFrames with many columns.
+		max_rows : int
+			Maximum number of rows displayed on the 
+			scatter plots when splom=True. 
+			Larger DataFrames are randomly sampled; 
+			histograms always use all the rows.
 		iplot_kwargs : key-value pairs
 			Keyword arguments to pass through to `iplot`
 	"""
-	sm=tools.scatter_matrix(self,theme=theme,bins=bins,color=color,size=size)
+	sm=tools.scatter_matrix(self,theme=theme,bins=bins,color=color,size=size,splom=splom,max_rows=max_rows)
 	if asFigure:
 		return sm
 	else:
@@ -1378,8 +1537,14 @@ def iplot(figure,validate=True,sharing=None,filename='',
 		scale : integer
 			Increase the resolution of the image by `scale` amount
 			Only valid when asImage=True		
+		encoding : string
+			If 'base64' then the numeric data arrays are
+			encoded as plotly.js typed arrays
+			Requires plotly.js 2.28 or above; with an older
+			plotly.js a warning is issued and the arrays
+			are not encoded
 	"""
-	valid_kwargs=['world_readable','legend','scale']
+	valid_kwargs=['world_readable','legend','scale','encoding']
 
 	for key in list(kwargs.keys()):
 		if key not in valid_kwargs:
@@ -1421,6 +1586,13 @@ def iplot(figure,validate=True,sharing=None,filename='',
 	if 'layout' in figure:
 		validate = False if 'shapes' in figure['layout'] else validate
 
+	## Typed arrays
+	if kwargs.get('encoding',None):
+		if validate:
+			figure=Figure(figure)
+		figure=tools.encode_figure(figure,kwargs['encoding'])
+		validate=False
+
 	## asURL
 	auto_open=True
 	if asUrl:
@@ -1450,6 +1622,7 @@ def iplot(figure,validate=True,sharing=None,filename='',
 					width=dimensions[0],height=dimensions[1],scale=kwargs.get('scale',None))
 				path=filename+'.png'
 			if display_image:
+				from IPython.display import display,Image
 				return display(Image(path))
 			else:
 				print('Image saved : {0}'.format(path))
@@ -1459,6 +1632,11 @@ def iplot(figure,validate=True,sharing=None,filename='',
 	if asPlot:
 		filename+='.html'
 		if offline.is_offline() and not online:
+			if tools.get_serializer()=='orjson':
+				if validate:
+					figure=Figure(figure)
+				return offline.write_html(figure, filename=filename, show_link=show_link,
+								link_text=link_text, auto_open=auto_open, config=config)
 			return offline.py_offline.plot(figure, filename=filename, validate=validate,
 								show_link=show_link, link_text=link_text, auto_open=auto_open, config=config)
 		else:
@@ -17,6 +17,11 @@ from __future__ import absolute_import
 import plotly.graph_objs as go
 import json
 import copy
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 
 from .plotlytools import iplot as pt_iplot
@@ -42,10 +47,396 @@ def get_annotation_kwargs():
 	return tools.__ANN_KWARGS
 def get_shapes_kwargs(): return tools.__SHAPES_KWARGS
 
+def _cache_key(*args):
+	"""
+	Returns a hashable key for the given arguments or None
+	if any of them cannot be serialized (no caching)
+	"""
+	try:
+		return json.dumps(args,sort_keys=True)
+	except (TypeError,ValueError):
+		return None
+
+def _copy_figure(fig):
+	"""
+	Copies the dictionaries and lists of a figure dict, 
+	data arrays are shared
+	"""
+	if isinstance(fig,dict):
+		return dict([(k,_copy_figure(v)) for k,v in list(fig.items())])
+	if isinstance(fig,list):
+		if fig and isinstance(fig[0],(dict,list)):
+			return [_copy_figure(_) for _ in fig]
+		return list(fig)
+	return fig
+
+_FRAMES_CACHE_SIZE=4
+
+class _FigureCache(object):
+	"""
+	Sliced/resampled frames and study figures computed by 
+	QuantFig.iplot. Entries are keyed on the study, slice, 
+	resample and data version so that only what changed is 
+	recomputed on the next render. Only the last 
+	_FRAMES_CACHE_SIZE frames that were used are kept.
+	"""
+	def __init__(self):
+		self.version=None
+		self.frames=OrderedDict()
+		self.frames_version=None
+		self.studies={}
+
+## Streaming
+#  Each study is advanced one bar at a time by a step function
+#  step(params,cols,i,n,state) -> (state,[trace values])
+#  where cols[column][i] is the current bar and n is the number
+#  of bars so far. The steps reproduce the values of the
+#  functions in cufflinks.ta
+
+_NAN=float('nan')
+
+def _mean(values):
+	return 1.0*sum(values)/len(values)
+
+def _div(a,b):
+	"""
+	Division with the pandas semantics for a zero divisor
+	"""
+	if b:
+		return 1.0*a/b
+	if a!=a or a==0:
+		return _NAN
+	return float('inf') if a>0 else -float('inf')
+
+def _true_range(h,l,c,i,n):
+	if n<2:
+		return h[i]-l[i]
+	return max(h[i]-l[i],abs(h[i]-c[i-1]),abs(l[i]-c[i-1]))
+
+def _windows(params,cols,i,n,key='column'):
+	for p in utils.make_list(params['periods']):
+		for c in utils.make_list(params[key]):
+			yield p,cols[c][i+1-p:i+1] if n>=p else None
+
+def _bands(kind,params,values):
+	if params.get('showbands',False):
+		values+=[{'y':params['{0}_lower'.format(kind)]},{'y':params['{0}_upper'.format(kind)]}]
+	return values
+
+def _step_sma(params,cols,i,n,state):
+	return state,[{'y':_mean(w) if w else _NAN} for p,w in _windows(params,cols,i,n)]
+
+def _step_boll(params,cols,i,n,state):
+	values=[]
+	for p,w in _windows(params,cols,i,n):
+		sma=std=_NAN
+		if w:
+			sma=_mean(w)
+			if p>1:
+				std=(sum([(_-sma)**2 for _ in w])/(p-1))**.5
+		values+=[{'y':sma},{'y':sma+std*params['boll_std']},{'y':sma-std*params['boll_std']}]
+	return state,values
+
+def _step_rsi(params,cols,i,n,state):
+	values=[]
+	for p,c in [(p,c) for p in utils.make_list(params['periods'])
+					  for c in utils.make_list(params['column'])]:
+		rsi=_NAN
+		if n>=p:
+			x=cols[c]
+			d=[x[j]-x[j-1] if n-1-i+j>0 else 0 for j in range(i+1-p,i+1)]
+			up=_mean([_ if _>0 else 0 for _ in d])
+			down=_mean([-_ if _<0 else 0 for _ in d])
+			rsi=100-_div(100,1+_div(up,down))
+		values.append({'y':rsi})
+	return state,_bands('rsi',params,values)
+
+def _step_cci(params,cols,i,n,state):
+	h,l,c=cols[params['high']],cols[params['low']],cols[params['close']]
+	values=[]
+	for p in utils.make_list(params['periods']):
+		cci=_NAN
+		if n>=p:
+			tp=[(l[j]+h[j]+c[j])/3.0 for j in range(i+1-p,i+1)]
+			avg=_mean(tp)
+			cci=_div(tp[-1]-avg,0.015*_mean([abs(_-avg) for _ in tp]))
+		values.append({'y':cci})
+	return state,_bands('cci',params,values)
+
+def _step_atr(params,cols,i,n,state):
+	h,l,c=cols[params['high']],cols[params['low']],cols[params['close']]
+	values=[]
+	for p in utils.make_list(params['periods']):
+		atr=_NAN
+		if n>=p:
+			atr=_mean([_true_range(h,l,c,j,n-i+j) for j in range(i+1-p,i+1)])
+		values.append({'y':atr})
+	return state,values
+
+def _step_ema(params,cols,i,n,state):
+	keys=[(p,c) for p in utils.make_list(params['periods'])
+				for c in utils.make_list(params['column'])]
+	state=[cols[c][i] if state is None else cols[c][i]*2.0/(p+1)+e*(1-2.0/(p+1))
+		   for (p,c),e in zip(keys,state or keys)]
+	return state,[{'y':e if n>=p else _NAN} for (p,c),e in zip(keys,state)]
+
+def _step_macd(params,cols,i,n,state):
+	periods=[params['fast_period'],params['slow_period'],params['signal_period']]
+	factors=[2.0/(_+1) for _ in periods]
+	columns=utils.make_list(params['column'])
+	_state=[]
+	values=[]
+	for c,s in zip(columns,state or columns):
+		x=cols[c][i]
+		if state is None:
+			fast=slow=x
+			signal=0
+		else:
+			fast,slow=[x*f+_*(1-f) for f,_ in zip(factors[:2],s[:2])]
+			signal=(fast-slow)*factors[2]+s[2]*(1-factors[2])
+		_state.append((fast,slow,signal))
+		values+=[{'y':fast-slow},{'y':signal}]
+	return _state,values
+
+def _step_adx(params,cols,i,n,state):
+	h,l,c=cols[params['high']],cols[params['low']],cols[params['close']]
+	periods=utils.make_list(params['periods'])
+	state=state or [(0,0,0,0,_NAN)]*len(periods)
+	if n>1:
+		up,down=h[i]-h[i-1],l[i-1]-l[i]
+		dm=(_true_range(h,l,c,i,n),max(up,0) if up>down else 0,max(down,0) if down>up else 0)
+	_state=[]
+	values=[]
+	for p,(tr,dm_plus,dm_minus,dx_sum,adx) in zip(periods,state):
+		sm=(tr,dm_plus,dm_minus)
+		di_plus=di_minus=_NAN
+		if n>1:
+			if n<=p+1:
+				sm=[_+__ for _,__ in zip(sm,dm)]
+			else:
+				sm=[_-(1.0*_/p)+__ for _,__ in zip(sm,dm)]
+			if n>p:
+				di_plus,di_minus=[100.0*_div(_,sm[0]) for _ in sm[1:]]
+				dx=100*_div(abs(di_plus-di_minus),di_plus+di_minus)
+				if n<=2*p:
+					dx_sum+=dx
+					if n==2*p:
+						adx=1.0*dx_sum/p
+				else:
+					adx=((adx*(p-1))+dx)/p
+		_state.append(tuple(sm)+(dx_sum,adx))
+		values+=[{'y':adx},{'y':di_plus},{'y':di_minus}] if params.get('di') else [{'y':adx}]
+	return _state,values
+
+def _step_volume(params,cols,i,n,state):
+	base=cols[params['base']]
+	up=1.0 if n>1 and base[i]-base[i-1]>0 else 0.0
+	return state,[{'y':cols[params['column']][i],'marker.color':up,'marker.line.color':up}]
+
+_STUDY_STEPS={'sma':_step_sma,'boll':_step_boll,'rsi':_step_rsi,'cci':_step_cci,
+			  'atr':_step_atr,'ema':_step_ema,'macd':_step_macd,'adx':_step_adx,
+			  'dmi':_step_adx,'volume':_step_volume}
+
+# Studies whose state depends on every previous bar
+_RECURSIVE_STUDIES=('ema','macd','adx','dmi')
+
+def _json_value(value):
+	"""
+	Returns a value that can be serialized to JSON,
+	NaN is returned as None
+	"""
+	if value!=value:
+		return None
+	return value.item() if isinstance(value,np.generic) else value
+
+class _BarStream(object):
+	"""
+	Tail of the QuantFigure.DataFrame and the state of each study
+	as they are advanced by QuantFig.append and QuantFig.update_last.
+	The appended bars are kept as lists and are only added
+	to the DataFrame when QuantFig.df is accessed.
+	"""
+	def __init__(self,qf,df):
+		self.key=qf._stream_key()
+		self.columns=list(df.columns)
+		self.index=df.index.tolist()
+		# x values of the rendered figure are formatted as dates
+		# only when the whole index is made of dates (see tools._index_strings)
+		self.dates=isinstance(df.index,pd.DatetimeIndex) and df.index.tz is None and \
+				   not (df.index.asi8%86400000000000).any()
+		self.cols=dict([(c,df[c].tolist()) for c in self.columns])
+		self.n=len(df)
+		self.pending=0
+		self.stale=False
+		self.keep=2
+		self.studies=[]
+		self.traces=0
+		for k,v in list(qf.studies.items()):
+			kind=v['kind']
+			if kind not in _STUDY_STEPS:
+				raise Exception('Study "{0}" ({1}) cannot be streamed'.format(k,kind))
+			params=utils.merge_dict(v['params'],v['display'])
+			if kind=='volume':
+				params['base']=qf._d[params['base'] if params['colorchange'] else 'volume']
+			if kind=='dmi':
+				params['di']=True
+			step=_STUDY_STEPS[kind]
+			periods=[_ for _ in utils.make_list(params.get('periods')) if isinstance(_,int)]
+			self.keep=max([self.keep]+[_+1 for _ in periods])
+			prev=state=None
+			values=[]
+			if kind in _RECURSIVE_STUDIES:
+				for i in range(self.n):
+					prev=state
+					state,values=step(params,self.cols,i,i+1,prev)
+			elif self.n:
+				state,values=step(params,self.cols,self.n-1,self.n,None)
+			self.studies.append([step,params,prev,state])
+			self.traces+=len(values)
+		self.trim()
+
+	def trim(self):
+		"""
+		Drops the values that are no longer needed by the studies
+		"""
+		k=len(self.index)-max(self.keep,self.pending+1)
+		if k>self.keep:
+			del self.index[:k]
+			for v in list(self.cols.values()):
+				del v[:k]
+
+	def push(self,label,bar,replace=False):
+		"""
+		Adds (or replaces the last) bar and returns the
+		values of each trace as a list [{attr:value}]
+		"""
+		if replace:
+			for c,v in list(bar.items()):
+				if c in self.cols:
+					self.cols[c][-1]=v
+			if not self.pending:
+				self.stale=True
+		else:
+			for c in self.columns:
+				self.cols[c].append(bar.get(c,_NAN))
+			self.index.append(label)
+			self.n+=1
+			self.pending+=1
+		i=len(self.index)-1
+		updates=[]
+		for study in self.studies:
+			step,params,prev,state=study
+			if not replace:
+				prev=state
+			state,values=step(params,self.cols,i,self.n,prev)
+			study[2:]=prev,state
+			updates+=values
+		return updates
+
+	def labels(self,k):
+		"""
+		Returns the last k index values formatted as the 
+		x values of the rendered figure
+		"""
+		index=pd.Index(self.index[-k:])
+		if not isinstance(index,pd.DatetimeIndex):
+			return [_json_value(_) for _ in index]
+		if self.dates:
+			return tools._index_strings(index).tolist()
+		return [str(_) for _ in index]
+
+	def flush(self,df):
+		"""
+		Returns the DataFrame with the pending bars
+		"""
+		k=self.pending+(1 if self.stale else 0)
+		if not k:
+			return df
+		bars=pd.DataFrame(dict([(c,v[-k:]) for c,v in list(self.cols.items())]),
+						  index=pd.Index(self.index[-k:],name=df.index.name),columns=self.columns)
+		bars=bars.astype(df.dtypes.to_dict(),errors='ignore')
+		df=pd.concat([df.iloc[:-1] if self.stale else df,bars])
+		self.pending=0
+		self.stale=False
+		self.trim()
+		return df
+
+def extend_figure(figure,patch):
+	"""
+	Applies the patch returned by QuantFig.append or
+	QuantFig.update_last to a figure in place
+
+	Parameters:
+	-----------
+		figure : Figure, FigureWidget or dict
+			Figure rendered with QuantFig.figure()
+		patch : dict
+			{'extend':[{'update':{attr:[[values]]},'indices':[traces]}],
+			 'replace':points}
+	"""
+	def extend(trace,attr,values):
+		path=attr.split('.')
+		key=path.pop()
+		for _ in path:
+			trace=trace[_]
+		old=[] if trace[key] is None else list(trace[key])
+		trace[key]=old[:len(old)-patch['replace']]+values
+
+	def apply():
+		data=figure['data']
+		for group in patch['extend']:
+			for attr,values in list(group['update'].items()):
+				for i,v in zip(group['indices'],values):
+					extend(data[i],attr,v)
+
+	if hasattr(figure,'batch_update'):
+		with figure.batch_update():
+			apply()
+	else:
+		apply()
+	return figure
+
+## Batch rendering
+#  The template QuantFig (layout, theme and studies) and its render
+#  plan are sent once to each worker process, each task only 
+#  carries its frame
+
+_RENDER_TEMPLATE=None
+
+def _init_render(template,plan):
+	global _RENDER_TEMPLATE
+	_RENDER_TEMPLATE=(template,plan) if template is not None else None
+
+def _render(task):
+	"""
+	Renders a frame with the template QuantFig and writes
+	the figure to path. Returns (name,path,seconds,error)
+	"""
+	import plotly.io as pio
+	name,df,path,format,include_plotlyjs=task
+	start=time.time()
+	try:
+		template,plan=_RENDER_TEMPLATE
+		qf=copy.copy(template)
+		qf._cache=_FigureCache()
+		qf.df=df
+		fig=qf._render_figure(plan)
+		if format=='json':
+			pio.write_json(fig,path,validate=False)
+		else:
+			pio.write_html(fig,path,validate=False,auto_open=False,
+						   include_plotlyjs=include_plotlyjs)
+		error=None
+	except Exception as e:
+		path,error=None,'{0}: {1}'.format(type(e).__name__,e)
+	return name,path,time.time()-start,error
+
 class QuantFig(object):
 	
 	def __init__(self,df,kind='candlestick',columns=None,**kwargs):
+		self._stream=None
 		self.df=df
+		self._cache=_FigureCache()
 		self.studies={}
 		self.data={}
 		self.theme={}
@@ -101,9 +492,22 @@ class QuantFig(object):
 		self.panels['spacing']=kwargs.pop('spacing',.08)
 		self.panels['top_margin']=kwargs.pop('top_margin',0.9)
 		self.panels['bottom_margin']=kwargs.pop('top_margin',0)
+		self._hash_data=kwargs.pop('hash_data',False)
 		self.update(**kwargs)
 
 
+	@property
+	def df(self):
+		if self._stream is not None:
+			self._df=self._stream.flush(self._df)
+		return self._df
+
+	@df.setter
+	def df(self,df):
+		self._df=df
+		self._stream=None
+		self._version=getattr(self,'_version',0)+1
+
 	def _get_schema(self):
 		"""
 		Returns a dictionary with the schema for a QuantFigure
@@ -135,10 +539,10 @@ class QuantFig(object):
 					States the 'from' and 'to' values which 
 					will get rendered as df.loc[from:to]
 			df : DataFrame
-				If omitted then the QuantFigure.DataFrame is resampled.
+				If omitted then the QuantFigure.DataFrame is sliced.
 		"""
 
-		df=self.df.copy() if df==None else df
+		df=self.df if df is None else df
 		if type(slice) not in (list,tuple):
 			raise Exception('Slice must be a tuple two values')
 		if len(slice)!=2:
@@ -173,11 +577,12 @@ class QuantFig(object):
 				For more information see http://pandas.pydata.org/pandas-docs/stable/generated/pandas.DataFrame.resample.html
 
 		"""
-		df=self.df.copy() if df is None else df
+		df=self.df if df is None else df
 		if rule==None:
 			return df 
 		else:
 			if isinstance(how,dict):
+				how=how.copy()
 				if 'ohlc' in how:
 					v=how.pop('ohlc')
 					for _ in ['open','high','low','close']: 
@@ -188,12 +593,79 @@ class QuantFig(object):
 						del how[_]
 			return df.resample(rule=rule,**kwargs).apply(how)
 
+	def _data_version(self):
+		"""
+		Returns the version of the QuantFigure.DataFrame.
+		The version is increased when a DataFrame is assigned 
+		to QuantFigure.df and by append/update_last, and it 
+		includes a cheap fingerprint of the DataFrame (shape, 
+		column sums and first/last rows) so that most changes 
+		made in place are detected as well. If the QuantFigure 
+		was created with hash_data=True then a hash of all the 
+		values is used instead (requires pandas>=0.20)
+		"""
+		df=self.df
+		if self._hash_data:
+			try:
+				values=pd.util.hash_pandas_object(df)
+			except TypeError:
+				values=pd.util.hash_pandas_object(df.astype(str))
+			return [self._version,hash(values.values.tobytes())]
+		fingerprint=[id(df),list(df.shape),[utils.make_string(_) for _ in df.columns]]
+		for c in df.columns:
+			values=df[c].values
+			if values.dtype.kind in 'iufb':
+				total=values.sum(dtype=float)
+				fingerprint.append(repr(total if total==total else np.nansum(values,dtype=float)))
+		if len(df):
+			for i in (0,-1):
+				fingerprint.append([utils.make_string(_) for _ in [df.index[i]]+df.iloc[i].tolist()])
+		return [self._version,fingerprint]
+
+	def _get_frame(self,_slice,_resample):
+		"""
+		Returns the sliced and resampled DataFrame.
+		While rendering (QuantFig.iplot) the frame is computed once
+		for each slice and resample and is kept for the next renders
+		while the QuantFigure.DataFrame is unchanged. The cached frame
+		is shared by the figure and every study and must not be
+		modified.
+
+		Parameters
+		----------
+			_slice : tuple(from,to)
+				See _get_sliced
+			_resample : str, list or dict
+				See _get_resampled
+		"""
+		key=_cache_key(_slice,_resample) if self._cache.version else None
+		if key is not None and key in self._cache.frames:
+			# the most recently used frames are kept last
+			df=self._cache.frames.pop(key)
+			self._cache.frames[key]=df
+			return df
+		df=self._get_sliced(_slice)
+		if _resample:
+			if utils.is_list(_resample):
+				df=self._get_resampled(*_resample,df=df)
+			elif utils.is_dict(_resample):
+				df=self._get_resampled(**dict(_resample,df=df))
+			else:
+				df=self._get_resampled(_resample,df=df)
+		if key is None:
+			return df.copy()
+		self._cache.frames[key]=df
+		while len(self._cache.frames)>_FRAMES_CACHE_SIZE:
+			self._cache.frames.popitem(last=False)
+		return df
+
 	def update(self,**kwargs):
 		"""
 		Updates the values for a QuantFigure
 		The key-values are automatically assigned to the correct 
 		section of the QuantFigure
 		"""
+		self._close_stream()
 		if 'columns' in kwargs:
 			self._d=ta._ohlc_dict(self.df,columns=kwargs.pop('columns',None))
 		schema=self._get_schema()
@@ -213,6 +685,7 @@ class QuantFig(object):
 		The key-values are automatically deleted from the correct 
 		section of the QuantFigure
 		"""
+		self._close_stream()
 		if args:
 			args=args[0] if utils.is_list(args[0]) else args
 			path=utils.dict_path(self.__dict__)
@@ -231,7 +704,120 @@ class QuantFig(object):
 				except:
 					raise Exception('Key: {0} not found'.format(a))
 
-	
+	def _stream_key(self):
+		return (self.data['kind'],self.data['slice'],self.data['resample'],
+				tuple(self.studies),tuple(self._d.items()))
+
+	def _close_stream(self):
+		"""
+		Adds the pending bars to the QuantFigure.DataFrame
+		and drops the stream state
+		"""
+		self._df=self.df
+		self._stream=None
+
+	def _get_stream(self):
+		"""
+		Returns the _BarStream for the current studies,
+		it is built on first use
+		"""
+		if self._stream is None or self._stream.key!=self._stream_key():
+			if self.data['kind'] not in ('candle','candlestick','ohlc'):
+				raise Exception('Only candlestick and ohlc figures can be streamed')
+			if self.data['resample'] or self.data['slice'][1] not in ('',None):
+				raise Exception('Figures with resample or with an end slice cannot be streamed')
+			self._close_stream()
+			self._stream=_BarStream(self,self._get_sliced(self.data['slice']))
+		return self._stream
+
+	def _push(self,bars,replace=False):
+		"""
+		Advances the stream and returns the trace patch
+		"""
+		stream=self._get_stream()
+		self._version+=1
+		updates=None
+		for label,bar in bars:
+			values=stream.push(label,bar,replace)
+			if updates is None:
+				updates=[dict([(attr,[]) for attr in v]) for v in values]
+			for update,v in zip(updates,values):
+				for attr,value in list(v.items()):
+					update[attr].append(_json_value(value))
+		updates.append(dict([(_,[_json_value(v) for v in stream.cols[self._d[_]][-len(bars):]])
+							 for _ in ('open','high','low','close')]))
+		x=stream.labels(len(bars))
+		groups={}
+		for trace,update in enumerate(updates):
+			update['x']=x
+			group=groups.get(tuple(update))
+			if group is None:
+				group=groups[tuple(update)]={'update':dict([(_,[]) for _ in update]),'indices':[]}
+			group['indices'].append(trace)
+			for attr,values in list(update.items()):
+				group['update'][attr].append(values)
+		return {'extend':list(groups.values()),'replace':1 if replace else 0}
+
+	def append(self,bars):
+		"""
+		Appends one or more bars to the QuantFigure.DataFrame
+		and advances each study by the new bars only.
+		Returns a patch with the new points of each trace of
+		QuantFigure.figure(), which can be sent to a front end
+		(Plotly.extendTraces(div,update,indices) for each
+		entry in patch['extend']) or applied to a Figure or
+		FigureWidget with extend_figure(fig,patch).
+		The patch can be serialized with json.dumps: the x values
+		are formatted as in the rendered figure and missing 
+		values are None.
+
+		Parameters:
+			bars : DataFrame or Series
+				New bars, with an index after the last one of
+				the QuantFigure.DataFrame.
+				A Series is a single bar whose name is its index.
+
+		Example:
+			patch=qf.append(pd.Series({'open':1,'high':2,'low':.5,'close':1.5,
+									   'volume':1000},name=pd.Timestamp('2019-01-02')))
+		"""
+		if isinstance(bars,pd.DataFrame):
+			bars=list(zip(bars.index,bars.to_dict('records')))
+		elif isinstance(bars,pd.Series):
+			bars=[(bars.name,bars.to_dict())]
+		else:
+			raise Exception('bars must be a DataFrame or a Series')
+		if not bars:
+			return {'extend':[],'replace':0}
+		stream=self._get_stream()
+		last=stream.index[-1] if stream.index else None
+		for label,bar in bars:
+			if label is None:
+				raise Exception('Each bar requires an index value')
+			if last is not None and not label>last:
+				raise Exception('Bars must be appended after {0}'.format(last))
+			last=label
+		return self._push(bars)
+
+	def update_last(self,bar):
+		"""
+		Updates the values of the last bar of the QuantFigure.DataFrame
+		(ie: the bar in progress) and recomputes the last point
+		of each study.
+		Returns a patch with the points that replace the last
+		point of each trace (patch['replace']=1), see append
+
+		Parameters:
+			bar : dict or Series
+				Values to update, ie: {'close':102.4,'high':103}
+		"""
+		if isinstance(bar,pd.Series):
+			bar=bar.to_dict()
+		if not self._get_stream().n:
+			raise Exception('There is no bar to update')
+		return self._push([(None,bar)],replace=True)
+
+
 	def figure(self,**kwargs):
 		"""
 		
@@ -240,6 +826,106 @@ class QuantFig(object):
 		"""
 		kwargs['asFigure']=True
 		return self.iplot(**kwargs)
+
+	def render_many(self,frames,output_dir,n_jobs=None,format='html',
+					include_plotlyjs='cdn',progress=False,chunksize=1,**kwargs):
+		"""
+		Renders a QuantFigure for each DataFrame in frames, using
+		this QuantFigure as template (layout, theme and studies),
+		and writes them to output_dir as <name>.html or <name>.json
+		Returns a DataFrame with the path and the render time
+		(seconds) of each figure, and the error if it failed.
+
+		Parameters:
+			frames : dict or list
+				{name:DataFrame} or list of (name,DataFrame)
+				All frames must have the columns of the
+				template DataFrame. Names must be unique
+				(also once made into file names)
+			output_dir : string
+				Directory where the figures are written
+			n_jobs : int
+				Number of worker processes
+				If 1 then the figures are rendered in this process
+				Default: number of CPUs
+			format : string
+				html
+				json
+			include_plotlyjs : bool or string
+				See plotly.io.write_html
+				Default: 'cdn'
+			progress : bool or function
+				If True then the progress is printed
+				If a function then it is called with 
+				(done,total,name,seconds,error) after each figure
+			chunksize : int
+				Number of frames sent to a worker at a time
+			kwargs
+				Passed to QuantFig.iplot for every figure
+
+		Example:
+			qf=cf.QuantFig(frames['AAPL'],title='EOD')
+			qf.add_sma([10,20])
+			qf.add_volume()
+			qf.render_many(frames,'charts',n_jobs=8,progress=True)
+		"""
+		if format not in ('html','json'):
+			raise Exception('Invalid format: {0}'.format(format))
+		if not os.path.exists(output_dir):
+			os.makedirs(output_dir)
+		if utils.is_dict(frames):
+			frames=list(frames.items())
+		else:
+			frames=list(frames)
+		names=[name for name,df in frames]
+		paths=[os.path.join(output_dir,'{0}.{1}'.format(utils.make_string(name).replace(os.sep,'_'),format))
+			   for name in names]
+		for values in (names,paths):
+			seen,duplicates=set(),set()
+			for _ in values:
+				(duplicates if _ in seen else seen).add(_)
+			if duplicates:
+				raise Exception('Duplicated frame names: {0}'.format(
+								', '.join(sorted([str(_) for _ in duplicates]))))
+		# the render plan (layout, studies and panels) is compiled once
+		plan=self._render_plan(asDict=True,**kwargs)
+		template=copy.copy(self)
+		template._cache=_FigureCache()
+		template.df=None
+
+		def tasks():
+			for (name,df),path in zip(frames,paths):
+				yield (name,df,path,format,include_plotlyjs)
+
+		n_jobs=n_jobs or multiprocessing.cpu_count()
+		if n_jobs==1:
+			_init_render(template,plan)
+			results=map(_render,tasks())
+		else:
+			pool=multiprocessing.Pool(min(n_jobs,len(frames) or 1),
+									  initializer=_init_render,initargs=(template,plan))
+			results=pool.imap_unordered(_render,tasks(),chunksize=chunksize)
+		rendered={}
+		try:
+			for name,path,seconds,error in results:
+				rendered[name]=(path,seconds,error)
+				if progress is True:
+					print('[{0}/{1}] {2} {3}'.format(len(rendered),len(frames),name,
+								error if error else '{0:.2f}s'.format(seconds)))
+				elif progress:
+					progress(len(rendered),len(frames),name,seconds,error)
+		except:
+			if n_jobs!=1:
+				pool.terminate()
+			raise
+		finally:
+			if n_jobs==1:
+				_init_render(None,None)
+		if n_jobs!=1:
+			pool.close()
+			pool.join()
+		return pd.DataFrame([rendered[name] for name in names],index=names,
+							columns=['path','seconds','error'])
 	
 	def _panel_domains(self,n=2,min_panel_size=.15,spacing=0.08,top_margin=1,bottom_margin=0):
 		"""
@@ -583,6 +1269,7 @@ class QuantFig(object):
 			id='{0} ({1})'.format(_id,n)
 			n+=1
 		self.studies[id]=study
+		self._close_stream()
 	   
 	def add_volume(self,colorchange=True,column=None,name='',str='{name}',**kwargs):
 		"""
@@ -1026,15 +1713,7 @@ class QuantFig(object):
 		_slice=kwargs.pop('slice',self.data.get('slice',(None,None)))
 		_resample=kwargs.pop('resample',self.data.get('resample',None))
 		
-		df=self._get_sliced(_slice).copy()
-		if _resample:
-			if utils.is_list(_resample):
-				df=self._get_resampled(*_resample,df=df)
-			elif utils.is_dict(_resample):
-				_resample.update(df=df)
-				df=self._get_resampled(**_resample)
-			else:
-				df=self._get_resampled(_resample,df=df)
+		df=self._get_frame(_slice,_resample)
 		
 		def get_params(locals_list,params,display,append_study=True):
 			locals_list.append('legendgroup')
@@ -1046,26 +1725,19 @@ class QuantFig(object):
 			return local_kwargs,params
  
 		if kind=='volume':
-			bar_colors=[]
 			local_kwargs,params=get_params([],params,display,False)
 			#Fix for 152
 			base_column=params['base'] if params['colorchange'] else 'volume'
-			base=df[self._d[base_column]]
+			base=df[self._d[base_column]].values
 			up_color=colors.normalize(display['up_color']) if 'rgba' not in display['up_color'] else display['up_color']
 			down_color=colors.normalize(display['down_color']) if 'rgba' not in display['down_color'] else display['down_color']
-			study_kwargs=utils.kwargs_from_keyword(kwargs,{},'study')
 			
-
-			for i in range(len(base)):
-				if i != 0:
-					if base[i] > base[i-1]:
-						bar_colors.append(up_color)
-					else:
-						bar_colors.append(down_color)
-				else:
-					bar_colors.append(down_color)
+			# 1 if base is up from the previous bar, 0 otherwise
+			up=np.zeros(len(base),dtype=bool)
+			up[1:]=np.diff(base)>0
+			bar_colors=colors.get_marker_colors(up,[down_color,up_color],0,1)
 			fig=df[params['column']].figure(kind='bar',theme=params['theme'],**kwargs)
-			fig['data'][0].update(marker=dict(color=bar_colors,line=dict(color=bar_colors)),
+			fig['data'][0].update(marker=dict(line=dict(bar_colors),**bar_colors),
 					  opacity=0.8)
 
 		if kind in ('sma','ema','atr','adx','dmi','ptps'):
@@ -1143,51 +1815,97 @@ class QuantFig(object):
 		return fig
 	
 	def iplot(self,**kwargs):
+		return self._render_figure(self._render_plan(**kwargs))
+
+	def _render_figure(self,plan):
+		"""
+		Renders the figure of a render plan (see _render_plan)
+		with the QuantFigure.DataFrame. The sliced/resampled 
+		frames and the study figures are cached while the 
+		DataFrame is unchanged.
+		"""
+		version=self._data_version()
+		if version!=self._cache.frames_version:
+			self._cache.frames=OrderedDict()
+			self._cache.frames_version=version
+		self._cache.version=version
+		try:
+			return self._iplot(plan)
+		finally:
+			self._cache.version=None
+
+	def _render_plan(self,**kwargs):
+		"""
+		Returns the render plan of the figure: everything that 
+		does not depend on the DataFrame (figure parameters, 
+		studies and their panels, export options and panel 
+		domains). A plan can be rendered with any DataFrame 
+		that has the columns of the QuantFigure.
+		"""
 		__QUANT_FIGURE_EXPORT = ['asFigure','asUrl','asImage','asPlot','display_image','validate',
-						 'sharing','online','filename','dimensions']
+						 'sharing','online','filename','dimensions','encoding']
 
 		layout=copy.deepcopy(self.layout)
 		data=copy.deepcopy(self.data)
-		self_kwargs=copy.deepcopy(self.kwargs)
+		plan={'kwargs':copy.deepcopy(self.kwargs)}
 
 		data['slice']=kwargs.pop('slice',data.pop('slice',(None,None)))
 		data['resample']=kwargs.pop('resample',data.pop('resample',None))
 
-		asFigure=kwargs.pop('asFigure',False)
+		plan['asFigure']=kwargs.pop('asFigure',False)
+		plan['asDict']=kwargs.pop('asDict',False)
 		showstudies=kwargs.pop('showstudies',True)
 		study_kwargs=utils.kwargs_from_keyword(kwargs,{},'study',True)
-		datalegend=kwargs.pop('datalegend',data.pop('datalegend',data.pop('showlegend',True)))
-		export_kwargs = utils.check_kwargs(kwargs,__QUANT_FIGURE_EXPORT)
+		plan['datalegend']=kwargs.pop('datalegend',data.pop('datalegend',data.pop('showlegend',True)))
+		plan['export']=utils.check_kwargs(kwargs,__QUANT_FIGURE_EXPORT)
 
-		_slice=data.pop('slice')
-		_resample=data.pop('resample')
+		plan['slice']=data.pop('slice')
+		plan['resample']=data.pop('resample')
 		
 		panel_data={}
 		for k in ['min_panel_size','spacing','top_margin','bottom_margin']:
 			panel_data[k]=kwargs.pop(k,self.panels[k])
 
-		d=self_kwargs
-		df=self._get_sliced(_slice).copy()
-		if _resample:
-			if utils.is_list(_resample):
-				df=self._get_resampled(*_resample,df=df)
-			elif utils.is_dict(_resample):
-				_resample.update(df=df)
-				df=self._get_resampled(**_resample)
-			else:
-				df=self._get_resampled(_resample,df=df)
+		plan['annotations']=layout.pop('annotations')
+		plan['shapes']=layout.pop('shapes')
+		if not 'shapes' in plan['shapes']:
+			plan['shapes']['shapes']=[]
+		plan['shape_kwargs']=utils.check_kwargs(kwargs,get_shapes_kwargs(),{},clean_origin=True)
+		plan['data']=data
+		plan['layout']=layout
+		plan['figure_kwargs']=kwargs
+		# trendlines are computed on the DataFrame, see _figure_kwargs
+		plan['d']=None if self.trendlines else self._figure_kwargs(plan)
+
+		plan['studies']=[]
+		panel_data['n']=1
+		if showstudies:
+			kwargs=utils.check_kwargs(kwargs,['theme','up_color','down_color'],{},False)
+			kwargs.update(**study_kwargs)
+			kwargs.update(slice=plan['slice'],resample=plan['resample'])
+			plan['study_kwargs']=kwargs
+			for k,v in list(self.studies.items()):
+				panel=v['kind'] in ('rsi','volume','macd','atr','adx','cci','dmi')
+				if panel:
+					panel_data['n']+=1
+				plan['studies'].append((k,v['kind'],panel))
+		plan['showstudies']=showstudies
+		plan['domains']=self._panel_domains(**panel_data)
+		return plan
 
-		annotations=layout.pop('annotations')
-		shapes=layout.pop('shapes')
-		if not 'shapes' in shapes:
-			shapes['shapes']=[]
+	def _figure_kwargs(self,plan):
+		"""
+		Returns the parameters of the main figure of a 
+		render plan, including the current trendlines
+		"""
+		annotations=copy.deepcopy(plan['annotations'])
+		shapes=copy.deepcopy(plan['shapes'])
 		for trend in self.trendlines:
 			_trend=self._get_trendline(**trend)
 			shapes['shapes'].append(_trend['shape'])
 			if 'text' in _trend['annotation']:
 				annotations['values'].append(_trend['annotation'])
-		shape_kwargs=utils.check_kwargs(kwargs,get_shapes_kwargs(),{},clean_origin=True)
-		for k,v in list(shape_kwargs.items()):
+		for k,v in list(plan['shape_kwargs'].items()):
 			if k in shapes:
 				if isinstance(v,list):
 					shapes[k].extend(v)
@@ -1195,20 +1913,28 @@ class QuantFig(object):
 					shapes[k].append(v)
 			else:
 				shapes[k]=[v]
-		for _ in [data,layout, self._d,
+		d=plan['kwargs']
+		for _ in [plan['data'],plan['layout'], self._d,
 				  self.theme,{'annotations':annotations['values']},
 				  annotations['params'],shapes]:
 			if _:
 				d=utils.merge_dict(d,_)
-		d=utils.deep_update(d,kwargs)
-		d=tools.updateColors(d)
+		d=utils.deep_update(d,copy.deepcopy(plan['figure_kwargs']))
+		return tools.updateColors(d)
+
+	def _iplot(self,plan):
+		if plan['d'] is None:
+			d=self._figure_kwargs(plan)
+		else:
+			d=copy.deepcopy(plan['d'])
+		df=self._get_frame(plan['slice'],plan['resample'])
 		fig = df.figure(**d)
 
 		if d['kind'] not in ('candle','candlestick','ohlc'):
 			tools._move_axis(fig, yaxis='y2')  # FIXME TKP
 			pass
 		else:
-			if not datalegend:
+			if not plan['datalegend']:
 
 				fig['data'][0]['decreasing'].update(showlegend=False)
 				fig['data'][0]['increasing'].update(showlegend=False)
@@ -1219,32 +1945,36 @@ class QuantFig(object):
 				if len(shape['yref'])==1: #not an explicity yref
 					shape.update(yref='y2')
 
-		panel_data['n']=1
-
 		which = [x['yaxis'] for x in fig['data']]
 		which.sort()
 		max_panel=int(which[-1][1:])
 		figures=[]
 		
 
-		if showstudies:
-			kwargs=utils.check_kwargs(kwargs,['theme','up_color','down_color'],{},False)
-			kwargs.update(**study_kwargs)
-			kwargs.update(slice=_slice,resample=_resample)
-			for k,v in list(self.studies.items()):
-				study_fig=self._get_study_figure(k,**kwargs)
-				study_fig=tools.fig_to_dict(study_fig)
+		if plan['showstudies']:
+			kwargs=plan['study_kwargs']
+			cached_studies={}
+			for k,kind,panel in plan['studies']:
+				v=self.studies[k]
+				key=_cache_key(k,v,kwargs,self.theme,self._d,self._cache.version)
+				if key in self._cache.studies:
+					study_fig=self._cache.studies[key]
+				else:
+					study_fig=tools.fig_to_dict(self._get_study_figure(k,**kwargs))
+				if key is not None:
+					cached_studies[key]=study_fig
+				study_fig=_copy_figure(study_fig)
 				if 'yaxis' in study_fig['layout']:
 					study_fig['layout']['yaxis1']=study_fig['layout']['yaxis'].copy()
 					del study_fig['layout']['yaxis']
-				if v['kind'] in ('boll','sma','ema','ptps'):
+				if kind in ('boll','sma','ema','ptps'):
 					tools._move_axis(study_fig, yaxis='y2')  # FIXME TKP
 					pass
-				if v['kind'] in ('rsi','volume','macd','atr','adx','cci','dmi'):
+				if panel:
 					max_panel+=1
-					panel_data['n']+=1
 					tools._move_axis(study_fig, yaxis='y{0}'.format(max_panel))  # FIXME TKP
 				figures.append(study_fig)
+			self._cache.studies=cached_studies
 			figures.append(fig)
 			fig=tools.merge_figures(figures)
 			
@@ -1253,7 +1983,7 @@ class QuantFig(object):
 			except:
 				fig['layout']['xaxis']['anchor']='y2'
 				
-		domains=self._panel_domains(**panel_data)
+		domains=copy.deepcopy(plan['domains'])
 		try:
 			for k,v in list(domains.items()):
 				fig['layout'][k].update(v)
@@ -1264,15 +1994,22 @@ class QuantFig(object):
 				del fig['layout']['yaxis1']
 			except:
 				pass
-		if asFigure:
+		export_kwargs=plan['export']
+		if plan['asDict']:
+			return fig
+		if plan['asFigure']:
+			if export_kwargs.get('encoding',None):
+				return tools.encode_figure(go.Figure(fig),export_kwargs['encoding'])
 			return go.Figure(fig)
 		else:
 			return pt_iplot(fig, **export_kwargs)
 	
 	def __getitem__(self,key):
-			return self.__dict__[key]
+			return getattr(self,key)
 		
 	def __repr__(self):
 		_d=self.__dict__.copy()
-		del _d['df']
+		del _d['_df']
+		del _d['_cache']
+		del _d['_stream']
 		return json.dumps(_d,sort_keys=True, indent=4)
@@ -1,15 +1,18 @@
+import base64
 import copy
+import importlib.util
+import json
+import warnings
 
 import numpy as np
 import pandas as pd
-import plotly.offline as py_offline
-import plotly.figure_factory as ff
 from plotly.graph_objs import Figure, Scatter, Line
 from plotly.subplots import make_subplots
 # from plotly.graph_objs.layout import XAxis, YAxis
 
 from . import themes
 from . import auth, ta
+from .exceptions import CufflinksError
 from .colors import normalize, to_rgba
 from .utils import (check_kwargs, deep_update, dict_replace_keyword,
                     kwargs_from_keyword, merge_dict, is_list,make_list)
@@ -51,6 +54,8 @@ __LAYOUT_KWARGS = []
 [__LAYOUT_KWARGS.extend(_) for _ in [__LAYOUT_VALID_KWARGS,__SHAPES_KWARGS,__GEO_KWARGS,__ANN_KWARGS,__LAYOUT_AXIS,
 									 __LAYOUT_AXIS_X,__LAYOUT_AXIS_Y]]
 
+__THEME_CACHE = {}
+
 def getTheme(theme=None):
 	"""
 	Returns a theme definition.
@@ -63,10 +68,31 @@ def getTheme(theme=None):
 
 	theme = theme.lower()
 	if theme in themes.THEMES:
-		return updateColors(copy.deepcopy(themes.THEMES[theme]))
+		return _copy_theme(_compile_theme(theme))
 	else:
 		raise Exception("Invalid Theme: {0}".format(theme))
 
+def _compile_theme(theme):
+	"""
+	Returns the theme definition with all colors normalized.
+	Compiled themes are cached for as long as their definition
+	in themes.THEMES is not replaced (ie by loading user themes). 
+	The returned dictionary is shared and must not be modified.
+	"""
+	definition=themes.THEMES[theme]
+	compiled=__THEME_CACHE.get(theme)
+	if compiled is None or compiled[0] is not definition:
+		compiled=(definition,updateColors(copy.deepcopy(definition)))
+		__THEME_CACHE[theme]=compiled
+	return compiled[1]
+
+def _copy_theme(obj):
+	if isinstance(obj,dict):
+		return dict([(k,_copy_theme(v)) for k,v in obj.items()])
+	if isinstance(obj,list):
+		return [_copy_theme(_) for _ in obj]
+	return obj
+
 def getThemes():
 	"""
 	Returns the list of available themes
@@ -958,6 +984,7 @@ def get_ohlc(df,up_color=None,down_color=None,theme=None,layout=None,**kwargs):
 	c_dir=ta._ohlc_dict(df)
 	args=[df[c_dir[_]] for _ in ohlc]
 	args.append(df.index)
+	import plotly.figure_factory as ff
 	fig=ff.create_ohlc(*args,**kwargs)
 	ohlc_bars={}
 	ohlc_bars['data']=fig['data']
@@ -979,6 +1006,7 @@ def get_candle(df,up_color=None,down_color=None,theme=None,layout=None,**kwargs)
 	c_dir=ta._ohlc_dict(df)
 	args=[df[c_dir[_]] for _ in ohlc]
 	args.append(df.index)
+	import plotly.figure_factory as ff
 	fig=ff.create_candlestick(*args,**kwargs)
 	candle={}
 	candle['data']=fig['data']
@@ -995,7 +1023,107 @@ def get_candle(df,up_color=None,down_color=None,theme=None,layout=None,**kwargs)
 	candle['layout']=merge_dict(layout,candle['layout'])
 	return candle
 
-def scatter_matrix(df,theme=None,bins=10,color='grey',size=2):
+__OHLC_RULES=[('1s',1),('5s',5),('15s',15),('30s',30),('1min',60),('5min',300),('15min',900),
+			  ('30min',1800),('60min',3600),('240min',14400),('1D',86400),('1W',604800),
+			  ('MS',2629746),('QS',7889238),('YS',31556952)]
+
+def get_ohlc_rule(index,max_bars):
+	"""
+	Returns the smallest resample rule with which a DatetimeIndex
+	is aggregated into at most max_bars (non empty) bars.
+	Returns None if no aggregation is required.
+	If not even a yearly aggregation fits then a warning is
+	issued and the yearly rule ('YS') is returned.
+
+	Parameters:
+	-----------
+		index : DatetimeIndex
+			Index of the OHLC data
+		max_bars : int
+			Maximum number of bars to be displayed
+	"""
+	if len(index)<=max_bars or len(index)<2:
+		return None
+	# bucket on wall time, as resample does for tz aware indexes
+	values=np.sort(index.tz_localize(None).asi8 if index.tz else index.asi8)
+	counts=pd.Series(0,index=index)
+	for rule,seconds in __OHLC_RULES:
+		if seconds<=86400:
+			# rules up to a day divide a day, so the non empty buckets
+			# can be counted without resampling (sparse data such as
+			# trading hours fills only a fraction of the span)
+			bars=1+np.count_nonzero(np.diff(values//(seconds*10**9)))
+		else:
+			# calendar anchored rules
+			bars=(counts.resample(rule).size()>0).sum()
+		if bars<=max_bars:
+			return rule
+	warnings.warn('max_bars={0} is too small for the date range, '
+				  'using a yearly aggregation'.format(max_bars))
+	return __OHLC_RULES[-1][0]
+
+def _index_strings(index):
+	"""
+	Returns the values of a DatetimeIndex as an array of
+	strings, formatted as index.astype('str') but with
+	'%Y-%m-%d' when all values are dates.
+	Other indexes are returned unchanged.
+
+	Parameters:
+	-----------
+		index : Index
+			Index to be formatted
+	"""
+	if not isinstance(index,pd.DatetimeIndex):
+		return index
+	if index.tz is not None:
+		return index.astype('str')
+	values=index.values
+	ns=values.view('i8')
+	if not (ns%86400000000000).any():
+		unit='D'
+	elif not (ns%1000000000).any():
+		unit='s'
+	else:
+		unit='us'
+	strings=np.datetime_as_string(values,unit=unit)
+	if unit!='D':
+		# same date/time separator as index.astype('str')
+		chars=strings.view('U1').reshape(len(strings),-1)
+		chars[~np.isnat(values),10]=' '
+	return strings
+
+def resample_ohlc(df,rule,ohlc_dict=None):
+	"""
+	Aggregates an OHLC(V) DataFrame to a coarser frequency
+		open : first
+		high : max
+		low : min
+		close : last
+		volume : sum
+	Periods with no data are dropped.
+
+	Parameters:
+	-----------
+		df : DataFrame
+			DataFrame with a DatetimeIndex
+		rule : string
+			Offset alias for the target frequency
+				Example: '5min', '1D', '1W'
+		ohlc_dict : dict
+			{ohlcv:column} as returned by ta._ohlc_dict
+			If omitted then the columns are inferred
+	"""
+	d=ta._ohlc_dict(df) if ohlc_dict is None else ohlc_dict
+	how={}
+	for k,v in (('open','first'),('high','max'),('low','min'),('close','last'),('volume','sum')):
+		if k in d:
+			how[d[k]]=v
+	df=df.resample(rule).agg(how)
+	ohlc=[d[_] for _ in ('open','high','low','close') if _ in d]
+	return df.dropna(subset=ohlc,how='all')
+
+def scatter_matrix(df,theme=None,bins=10,color='grey',size=2,splom=False,max_rows=None):
 	"""
 	Displays a matrix with scatter plot for each pair of
 	Series in the DataFrame.
@@ -1013,10 +1141,23 @@ def scatter_matrix(df,theme=None,bins=10,color='grey',size=2):
 			Color to be used for each scatter plot
 		size : int
 			Size for each marker on the scatter plot
+		splom : bool
+			If True then all the scatter plots are drawn
+			by a single plotly splom trace and the 
+			histograms are binned locally.
+			Recommended for DataFrames with many columns.
+		max_rows : int
+			Maximum number of rows displayed on the 
+			scatter plots when splom=True. 
+			Larger DataFrames are randomly sampled; 
+			histograms always use all the rows.
 	"""
 	if not theme:
 		theme = auth.get_config_file()['theme']
 
+	if splom:
+		return splom_matrix(df,theme=theme,bins=bins,color=color,size=size,max_rows=max_rows)
+
 	figs=[]
 	for i in df.columns:
 		for j in df.columns:
@@ -1033,6 +1174,61 @@ def scatter_matrix(df,theme=None,bins=10,color='grey',size=2):
 	sm['layout'].update(bargap=.02,showlegend=False)
 	return sm
 
+def splom_matrix(df,theme=None,bins=10,color='grey',size=2,max_rows=None,gap=.02):
+	"""
+	Returns a scatter matrix figure made of a single splom 
+	trace and a histogram (bars) on each cell of the diagonal
+
+	Parameters:
+	-----------
+		df : DataFrame
+			Pandas DataFrame
+		theme : string
+			Theme to be used (if not the default)
+		bins : int
+			Number of bins to use for histogram
+		color : string
+			Color to be used for each scatter plot
+		size : int
+			Size for each marker on the scatter plot
+		max_rows : int
+			Maximum number of rows displayed on the 
+			scatter plots. Larger DataFrames are
+			randomly sampled
+		gap : float
+			Space between cells (as a fraction of 
+			the figure)
+	"""
+	n=len(df.columns)
+	sample=df.sample(n=max_rows,random_state=0) if max_rows and len(df)>max_rows else df
+	color=normalize(color)
+	layout=getLayout(theme=theme)
+	axis=layout.pop('xaxis')
+	layout.pop('yaxis')
+	axis.update(showgrid=False)
+	data=[dict(type='splom',showupperhalf=True,diagonal=dict(visible=False),
+			   dimensions=[dict(label=str(c),values=sample[c].values) for c in df.columns],
+			   marker=dict(color=color,size=size),showlegend=False)]
+	for i,c in enumerate(df.columns):
+		suffix='' if i==0 else str(i+1)
+		x_domain=[1.0*i/n+gap/2,1.0*(i+1)/n-gap/2]
+		y_domain=[1-1.0*(i+1)/n+gap/2,1-1.0*i/n-gap/2]
+		layout['xaxis'+suffix]=dict(axis,domain=x_domain)
+		layout['yaxis'+suffix]=dict(axis,domain=y_domain)
+		if df[c].dtype.kind in 'iuf':
+			values=df[c].values
+			values=values[np.isfinite(values)]
+			edges=get_bin_edges([values],bins)
+			hist_axis='y{0}'.format(n+i+1)
+			layout['yaxis{0}'.format(n+i+1)]=dict(overlaying='y'+suffix,visible=False,
+											   rangemode='tozero',fixedrange=True)
+			data.append(dict(type='bar',x=(edges[:-1]+edges[1:])/2,y=get_histogram(values,edges),
+							 width=np.diff(edges),xaxis='x'+suffix,yaxis=hist_axis,
+							 marker=dict(color=to_rgba(color,.6),line=dict(color=color,width=1)),
+							 name=str(c),showlegend=False))
+	layout.update(showlegend=False,dragmode='select',hovermode='closest')
+	return Figure(data=data,layout=layout)
+
 ## Trace dictionary
 
 @property
@@ -1612,14 +1808,16 @@ def _move_axis(d, xaxis=None, yaxis=None):
 ### Offline
 
 def go_offline(connected = False, offline=True):
+	from . import offline as cf_offline
 	if offline:
-		py_offline.init_notebook_mode(connected)
-		py_offline.__PLOTLY_OFFLINE_INITIALIZED=True
+		cf_offline._plotly_offline().init_notebook_mode(connected)
+		cf_offline._OFFLINE_INITIALIZED=True
 	else:
-		py_offline.__PLOTLY_OFFLINE_INITIALIZED=False
+		cf_offline._OFFLINE_INITIALIZED=False
 
 def is_offline():
-	return py_offline.__PLOTLY_OFFLINE_INITIALIZED
+	from . import offline as cf_offline
+	return cf_offline._OFFLINE_INITIALIZED
 
 ### Plotly 3
 
@@ -1628,6 +1826,380 @@ def fig_to_dict(fig):
 		fig=fig.to_dict()
 	return fig
 
+### Histograms
+
+def get_bin_edges(values,bins=None):
+	"""
+	Returns the bin edges shared by a list of arrays
+
+	Parameters:
+	-----------
+		values : list(array)
+			Arrays of finite numeric values
+		bins : int or tuple 
+			if int:
+				Specifies the number of bins 
+			if tuple:
+				(start, end, size)
+				start : starting value
+				end: end value
+				size: bin size
+			If None then the bin size is the smallest
+			one given by Sturges' rule for each array.
+			Note that this differs from plotly.js' autobin,
+			hence the bins may not match those of a
+			histogram binned by plotly.js
+	"""
+	if type(bins) in (tuple,list):
+		if len(bins)!=3:
+			raise CufflinksError('bins must be (start, end, size), got {0}'.format(bins))
+		start,end,size=[float(_) for _ in bins]
+		if not size>0 or not end>start:
+			raise CufflinksError('Invalid bins {0}: size must be positive '
+								 'and end greater than start'.format(bins))
+	elif bins and int(bins)<1:
+		raise CufflinksError('bins must be a positive integer, got {0}'.format(bins))
+	values=[_ for _ in values if len(_)]
+	if not values:
+		return np.array([0.,1.])
+	lower=min([_.min() for _ in values])
+	upper=max([_.max() for _ in values])
+	if type(bins) in (tuple,list):
+		return start+size*np.arange(int(np.ceil((end-start)/size))+1)
+	if upper==lower:
+		upper=lower+1
+	if bins:
+		return np.linspace(lower,upper,int(bins)+1)
+	size=min([(_.max()-_.min())/(np.ceil(np.log2(len(_)))+1) for _ in values])
+	size=size if size>0 else upper-lower
+	return lower+size*np.arange(int(np.ceil((upper-lower)/size))+1)
+
+def get_histogram(values,edges,histnorm=''):
+	"""
+	Returns the height of each bin 
+
+	Parameters:
+	-----------
+		values : array
+			Array of finite numeric values
+		edges : array
+			Bin edges
+			See get_bin_edges()
+		histnorm : string
+				'' (frequency)
+				percent
+				probability
+				density
+				probability density
+	"""
+	counts=np.histogram(values,edges)[0].astype(float)
+	if histnorm in ('percent','probability','probability density'):
+		total=counts.sum()
+		if total:
+			counts/=total
+		if histnorm=='percent':
+			counts*=100
+	if 'density' in histnorm:
+		counts/=np.diff(edges)
+	return counts
+
+### Box Plots
+
+def get_box_stats(values,boxpoints=False,max_points=1000):
+	"""
+	Returns the precomputed statistics of a box plot 
+	(q1, median, q3, lowerfence, upperfence and mean)
+	and the sample points to be displayed.
+	Quartiles follow plotly's default (linear) method.
+
+	Parameters:
+	-----------
+		values : array
+			Numeric values
+		boxpoints : string or bool
+			Sample points to be returned
+				outliers
+				suspectedoutliers : same points as outliers,
+					plotly.js highlights the suspected ones
+				all
+				False
+			If False then the fences are set at the
+			minimum and maximum values.
+		max_points : int
+			Maximum number of sample points.
+			If there are more points then an evenly 
+			spaced subset of the sorted points is returned,
+			which always includes the extremes.
+	"""
+	values=np.asarray(values,dtype=float)
+	values=np.sort(values[np.isfinite(values)])
+	if not len(values):
+		return {},values
+	q1,median,q3=np.percentile(values,[25,50,75])
+	if boxpoints:
+		iqr=q3-q1
+		lowerfence=values[np.searchsorted(values,q1-1.5*iqr)]
+		upperfence=values[np.searchsorted(values,q3+1.5*iqr,side='right')-1]
+	else:
+		lowerfence,upperfence=values[0],values[-1]
+	stats=dict(q1=[q1],median=[median],q3=[q3],lowerfence=[lowerfence],
+			   upperfence=[upperfence],mean=[values.mean()])
+	if boxpoints=='all':
+		points=values
+	elif boxpoints:
+		points=values[(values<lowerfence)|(values>upperfence)]
+	else:
+		points=values[:0]
+	if len(points)>max_points:
+		points=points[np.linspace(0,len(points)-1,max_points).astype(int)]
+	return stats,points
+
+### Bubbles
+
+def get_bubble_sizes(values,abs_size=False):
+	"""
+	Returns the marker sizes of a bubble chart.
+	Values are scaled linearly between 12 and 112 
+	unless abs_size=True.
+
+	Parameters:
+	-----------
+		values : array
+			Values to be represented by the size 
+			of each bubble
+		abs_size : bool
+			If True then the values are used 
+			as the marker sizes
+	"""
+	values=np.asarray(values)
+	if abs_size:
+		return values
+	values=values.astype(float)
+	if len(values)>1:
+		rgmin=np.nanmin(values)
+		rgmax=np.nanmax(values)
+		if rgmax>rgmin:
+			return np.floor(100*(values-rgmin)/(rgmax-rgmin))+12
+	return np.full(len(values),12)
+
+### Matrices
+
+def reduce_matrix(z,max_cells,func='mean'):
+	"""
+	Reduces a matrix by aggregating blocks of adjacent cells 
+	so that it does not exceed max_cells along each axis.
+	Returns the reduced matrix along with the block size 
+	as (rows,columns)
+
+	Parameters:
+	-----------
+		z : 2D array
+			Matrix
+		max_cells : int or tuple
+			Maximum number of cells along each axis
+			if int:
+				applies to both axes
+			if tuple:
+				(rows, columns)
+		func : string
+			Aggregation function applied to each block
+			NaN values are ignored
+				mean
+				max
+				min
+	"""
+	if func not in ('mean','max','min'):
+		raise Exception("Invalid cell function: {0}".format(func))
+	z=np.asarray(z,dtype=float)
+	if not is_list(max_cells):
+		max_cells=(max_cells,max_cells)
+	rows=int(np.ceil(z.shape[0]*1.0/max_cells[0]))
+	cols=int(np.ceil(z.shape[1]*1.0/max_cells[1]))
+	if rows<=1 and cols<=1:
+		return z,(1,1)
+	shape=(int(np.ceil(z.shape[0]*1.0/rows)),int(np.ceil(z.shape[1]*1.0/cols)))
+	blocks=np.full((shape[0]*rows,shape[1]*cols),np.nan)
+	blocks[:z.shape[0],:z.shape[1]]=z
+	blocks=blocks.reshape(shape[0],rows,shape[1],cols)
+	with warnings.catch_warnings():
+		warnings.simplefilter('ignore',RuntimeWarning)
+		z=getattr(np,'nan'+func)(blocks,axis=(1,3))
+	return z,(rows,cols)
+
+### Typed Arrays
+
+__TYPED_ARRAY_KEYS = ['x','y','z','open','high','low','close']
+__TYPED_ARRAY_MARKER_KEYS = ['size','color']
+__TYPED_ARRAY_DTYPES = {'float64':'f8','float32':'f4','int32':'i4','uint32':'u4',
+						'int16':'i2','uint16':'u2','int8':'i1','uint8':'u1'}
+
+def to_typed_array(values):
+	"""
+	Returns the plotly.js typed array specification of a
+	numeric array
+		{'dtype':'f8','bdata':base64 string}
+	2D arrays also include a 'shape' key.
+	Returns None if the values are not numeric.
+
+	Parameters:
+	-----------
+		values : list or array
+			Values to be encoded
+	"""
+	arr=np.asarray(values)
+	if arr.dtype.kind not in 'iuf' or arr.ndim not in (1,2):
+		return None
+	if arr.dtype.name not in __TYPED_ARRAY_DTYPES:
+		# 64 bit integers are not supported by plotly.js
+		if arr.dtype.kind in 'iu' and arr.size and \
+				arr.min()>=np.iinfo('int32').min and arr.max()<=np.iinfo('int32').max:
+			arr=arr.astype('int32')
+		elif arr.dtype.name=='float16':
+			arr=arr.astype('float32')
+		else:
+			arr=arr.astype('float64')
+	arr=np.ascontiguousarray(arr,dtype=arr.dtype.newbyteorder('<'))
+	typed={'dtype':__TYPED_ARRAY_DTYPES[arr.dtype.name],
+		   'bdata':base64.b64encode(arr.tobytes()).decode('ascii')}
+	if arr.ndim==2:
+		typed['shape']='{0}, {1}'.format(*arr.shape)
+	return typed
+
+def get_plotlyjs_version():
+	"""
+	Returns the version of the plotly.js bundle shipped
+	with plotly as a tuple of integers, or None if it
+	cannot be determined.
+	"""
+	try:
+		from plotly.offline import get_plotlyjs_version as _version
+		return tuple(int(v) for v in _version().split('.')[:3])
+	except Exception:
+		return None
+
+def encode_figure(figure,encoding='base64',plotlyjs_version=None):
+	"""
+	Returns a figure (dict) in which the numeric data arrays
+	(x, y, z, open, high, low, close, marker size and marker color)
+	are encoded as plotly.js typed arrays.
+	Non numeric arrays (dates, text) are left untouched.
+	Typed arrays require plotly.js 2.28 or above; with an older
+	plotly.js a warning is issued and the data arrays are
+	left as plain lists.
+
+	Parameters:
+	-----------
+		figure : Figure or dict
+			Plotly Figure
+		encoding : string
+			Encoding for the data arrays
+				base64
+		plotlyjs_version : string or tuple
+			Version of plotly.js that renders the figure.
+			If None then the version bundled with plotly is used.
+	"""
+	if encoding not in ('base64',):
+		raise Exception("Invalid encoding: {0}".format(encoding))
+	figure=fig_to_dict(figure)
+	if plotlyjs_version is None:
+		plotlyjs_version=get_plotlyjs_version()
+	elif isinstance(plotlyjs_version,str):
+		plotlyjs_version=tuple(int(v) for v in plotlyjs_version.split('.')[:3])
+	if plotlyjs_version is not None and tuple(plotlyjs_version)<(2,28):
+		warnings.warn('encoding={0!r} requires plotly.js 2.28 or above '
+					  '(found {1}), the data arrays are not encoded'.format(
+					  encoding,'.'.join(str(v) for v in plotlyjs_version)))
+		return figure
+
+	def encode(d,keys):
+		for k in keys:
+			if isinstance(d.get(k,None),(list,tuple,np.ndarray,pd.Series,pd.Index)):
+				typed=to_typed_array(d[k])
+				if typed:
+					d[k]=typed
+		return d
+
+	data=[]
+	for trace in figure.get('data',[]):
+		trace=dict(trace) if isinstance(trace,dict) else trace.to_plotly_json()
+		encode(trace,__TYPED_ARRAY_KEYS)
+		if isinstance(trace.get('marker',None),dict):
+			trace['marker']=encode(dict(trace['marker']),__TYPED_ARRAY_MARKER_KEYS)
+		data.append(trace)
+	figure=dict(figure)
+	figure['data']=data
+	return figure
+
+### JSON Serialization
+
+__SERIALIZERS = ['auto','orjson','json']
+
+def get_serializer(serializer=None):
+	"""
+	Returns the name of the JSON serializer to be used
+	when exporting a figure.
+		orjson : fast serializer with native NumPy support
+		json : plotly's default JSON encoder
+
+	Parameters:
+	-----------
+		serializer : string
+			auto : orjson if it is installed, json otherwise
+			orjson
+			json
+			If None then the value set in the config file is used
+			See cufflinks.set_config_file()
+	"""
+	if serializer is None:
+		serializer=auth.get_config_file()['serializer']
+	if serializer not in __SERIALIZERS:
+		raise Exception("Invalid serializer: {0}".format(serializer))
+	if serializer=='json':
+		return 'json'
+	if importlib.util.find_spec('orjson') is None:
+		if serializer=='orjson':
+			raise CufflinksError("orjson is required for serializer='orjson': " \
+					"please run " \
+					"pip install orjson")
+		return 'json'
+	return 'orjson'
+
+def _orjson_default(obj):
+	if isinstance(obj,(pd.Series,pd.Index)):
+		obj=obj.values
+	if isinstance(obj,np.ndarray):
+		return obj.tolist()
+	if isinstance(obj,np.generic):
+		return obj.item()
+	if hasattr(obj,'to_plotly_json'):
+		return obj.to_plotly_json()
+	raise TypeError
+
+def to_json(figure,serializer=None):
+	"""
+	Returns the JSON representation of a figure
+
+	Parameters:
+	-----------
+		figure : Figure or dict
+			Plotly figure
+		serializer : string
+			auto : orjson if it is installed, json otherwise
+			orjson
+			json
+			If None then the value set in the config file is used
+	"""
+	figure=fig_to_dict(figure)
+	if get_serializer(serializer)=='orjson':
+		import orjson
+		try:
+			return orjson.dumps(figure,default=_orjson_default,
+								option=orjson.OPT_SERIALIZE_NUMPY|orjson.OPT_NON_STR_KEYS).decode('utf-8')
+		except TypeError:
+			pass
+	from plotly.utils import PlotlyJSONEncoder
+	return json.dumps(figure,cls=PlotlyJSONEncoder)
+
 Figure.axis=axis
 Figure.trace_dict=trace_dict
 Figure.set_axis=_set_axis
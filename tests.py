@@ -30,6 +30,71 @@ class TestIPlot(unittest.TestCase):
 	def test_scatter_matrix(self):
 		self.df.scatter_matrix(asFigure=True)
 
+	def test_theme_cache(self):
+		theme = cf.tools.getTheme('pearl')
+		theme['layout']['xaxis']['gridcolor'] = 'red'
+		assert_equals(cf.tools.getTheme('pearl')['layout']['xaxis']['gridcolor'],
+					  cf.normalize(cf.themes.THEMES['pearl']['layout']['xaxis']['gridcolor']))
+
+	def test_config_cache(self):
+		import os
+		path = cf.auth.CONFIG_FILE
+		mtime = os.path.getmtime(path)
+		for _ in range(3):
+			self._iplot(self.df)
+		assert_equals(os.path.getmtime(path), mtime)
+		config = cf.get_config_file()
+		config['theme'] = 'invalid'
+		assert cf.get_config_file('theme')['theme'] != 'invalid'
+		cf.reload_config()
+
+	def test_memory_backend(self):
+		import os
+		path = cf.auth.CONFIG_FILE
+		mtime = os.path.getmtime(path)
+		theme = cf.get_config_file()['theme']
+		try:
+			cf.set_config_file(backend='memory', theme='solar')
+			assert_equals(cf.auth.get_backend(), 'memory')
+			assert_equals(cf.get_config_file()['theme'], 'solar')
+			self._iplot(self.df)
+			assert_equals(os.path.getmtime(path), mtime)
+		finally:
+			cf.set_config_file(backend='file')
+		assert_equals(cf.get_config_file()['theme'], theme)
+
+	def test_lazy_imports(self):
+		import subprocess, sys
+		code = ("import sys, cufflinks;"
+				"print(','.join(m for m in ('plotly.figure_factory','IPython') if m in sys.modules))")
+		out = subprocess.check_output([sys.executable, '-c', code]).decode().strip()
+		assert_equals(out, '')
+
+	def test_accessor(self):
+		fig = self.df.cf.iplot(kind='bar', asFigure=True)
+		assert_equals(fig.to_json(), self.df.iplot(kind='bar', asFigure=True).to_json())
+		s = self.df[self.df.columns[0]]
+		assert_equals(s.cf.normalize().tolist(), s.normalize().tolist())
+
+	def test_accessor_mode(self):
+		import os, subprocess, sys
+		code = ("import sys, pandas as pd, cufflinks as cf;"
+				"loaded = 'cufflinks.plotlytools' in sys.modules or hasattr(pd.DataFrame, 'iplot');"
+				"fig = cf.datagen.lines(3, 10).cf.figure(kind='bar');"
+				"print(loaded, fig.data[0].type)")
+		env = dict(os.environ, CUFFLINKS_PANDAS_API='accessor')
+		out = subprocess.check_output([sys.executable, '-c', code], env=env).decode().strip()
+		assert_equals(out, 'False bar')
+
+	def test_scatter_matrix_splom(self):
+		df = cf.datagen.lines(4, 500)
+		fig = df.scatter_matrix(splom=True, max_rows=100, asFigure=True)
+		assert_equals(fig['data'][0]['type'], 'splom')
+		assert_equals(len(fig['data'][0]['dimensions']), 4)
+		assert_equals(len(fig['data'][0]['dimensions'][0]['values']), 100)
+		assert_equals([t['type'] for t in fig['data'][1:]], ['bar'] * 4)
+		assert_equals(sum(fig['data'][1]['y']), 500)
+
 def test_irregular_subplots():
 	df = cf.datagen.bubble(10, 50, mode='stocks')
 	figs = cf.figures(df, [
@@ -94,6 +159,41 @@ def histogram_input_argument_tests():
 	_generate_tests(TestIPlot, histogram_test, 'histogram', options)
 
 
+def histogram_prebin_input_argument_tests():
+	df = cf.datagen.histogram(3, n=500)
+	options = {
+		'bins': [20, (-3, 3, 0.5)],
+		'orientation': ['h'],
+		'histnorm': ['percent', 'probability density']
+	}
+
+	def histogram_prebin_test(self, **kwargs):
+		fig = self._iplot(df, kind='histogram', prebin=True, **kwargs)
+		for trace in fig['data']:
+			assert_equals(trace['type'], 'bar')
+			heights = trace['x'] if kwargs.get('orientation') == 'h' else trace['y']
+			heights = np.asarray(heights)
+			if kwargs.get('histnorm') == 'percent':
+				assert np.isclose(heights.sum(), 100)
+			elif kwargs.get('histnorm') == 'probability density':
+				assert np.isclose((heights * np.asarray(trace['width'])).sum(), 1)
+			elif not isinstance(kwargs.get('bins'), tuple):
+				assert_equals(heights.sum(), len(df))
+
+	_generate_tests(TestIPlot, histogram_prebin_test, 'histogram_prebin', options)
+
+
+def test_histogram_invalid_bins():
+	df = cf.datagen.histogram(2, n=50)
+	for bins in ((0, 1, 0), (1, 0, 0.5), (0, 1), 0.5):
+		try:
+			df.iplot(kind='histogram', prebin=True, bins=bins, asFigure=True)
+		except cf.CufflinksError:
+			pass
+		else:
+			raise AssertionError(bins)
+
+
 def heatmap_input_argument_tests():
 	options = {}
 
@@ -106,6 +206,40 @@ def heatmap_input_argument_tests():
 
 	_generate_tests(TestIPlot, heatmap_test, 'heatmap', options)
 
+
+def heatmap_max_cells_input_argument_tests():
+	df = cf.datagen.heatmap(20, 30)
+	options = {
+		'kind': ['surface'],
+		'max_cells': [10, (5, 20)],
+		'cellfunc': ['max']
+	}
+
+	def heatmap_max_cells_test(self, **kwargs):
+		fig = self._iplot(df, **dict({'kind': 'heatmap'}, **kwargs))
+		z = np.asarray(fig['data'][0]['z'])
+		max_cells = kwargs.get('max_cells', df.shape[::-1])
+		max_cells = max_cells if isinstance(max_cells, tuple) else (max_cells, max_cells)
+		assert z.shape[0] <= max_cells[0] and z.shape[1] <= max_cells[1]
+		assert_equals(len(fig['data'][0]['x']), z.shape[1])
+		assert_equals(len(fig['data'][0]['y']), z.shape[0])
+		if kwargs.get('cellfunc') == 'max':
+			assert np.isclose(z.max(), df.values.max())
+
+	_generate_tests(TestIPlot, heatmap_max_cells_test, 'heatmap_max_cells', options)
+
+
+def test_heatmap_max_cells_z():
+	df = pd.DataFrame([(i, j, i * j) for i in range(20) for j in range(30)],
+					  columns=['a', 'b', 'c'])
+	fig = df.iplot(kind='heatmap', x='a', y='b', z='c', max_cells=(10, 5),
+				   cellfunc='max', asFigure=True)
+	z = np.asarray(fig['data'][0]['z'])
+	assert_equals(z.shape, (10, 5))
+	assert_equals(list(fig['data'][0]['x']), [0, 4, 8, 12, 16])
+	assert_equals(z.max(), 19 * 29)
+
+
 def box_input_argument_tests():
 	options = {}
 
@@ -115,6 +249,154 @@ def box_input_argument_tests():
 	_generate_tests(TestIPlot, box_test, 'box', options)
 
 
+def box_precompute_input_argument_tests():
+	df = cf.datagen.box(3, n=500)
+	options = {
+		'boxpoints': ['outliers', 'suspectedoutliers', 'all'],
+		'orientation': ['h'],
+		'max_points': [10]
+	}
+
+	def box_precompute_test(self, **kwargs):
+		fig = self._iplot(df, kind='box', precompute=True, **kwargs)
+		boxes = [t for t in fig['data'] if t['type'] == 'box']
+		assert_equals(len(boxes), len(df.columns))
+		for box in boxes:
+			values = df[box['name']]
+			assert np.isclose(box['median'][0], values.median())
+			assert np.isclose(box['q1'][0], values.quantile(.25))
+			assert np.isclose(box['q3'][0], values.quantile(.75))
+			if not kwargs.get('boxpoints'):
+				assert np.isclose(box['lowerfence'][0], values.min())
+				assert np.isclose(box['upperfence'][0], values.max())
+			assert_equals(box['boxpoints'], kwargs.get('boxpoints', False))
+			points = box['x' if kwargs.get('orientation') == 'h' else 'y']
+			if kwargs.get('boxpoints'):
+				assert 0 < len(points[0]) <= kwargs.get('max_points', 1000)
+			else:
+				assert points is None
+
+	_generate_tests(TestIPlot, box_precompute_test, 'box_precompute', options)
+
+
+def candle_input_argument_tests():
+	df = cf.datagen.ohlcv(300)
+	options = {
+		'kind': ['candle', 'ohlc'],
+		'max_bars': [20]
+	}
+
+	def candle_test(self, **kwargs):
+		kwargs.setdefault('kind', 'candlestick')
+		fig = self._iplot(df, **kwargs)
+		if 'max_bars' in kwargs:
+			assert len(fig['data'][0]['x']) <= kwargs['max_bars']
+
+	_generate_tests(TestIPlot, candle_test, 'candle', options)
+
+def test_ohlc_rule():
+	import warnings
+	index = pd.date_range('2021-01-31', '2021-03-01', freq='D')
+	rule = cf.tools.get_ohlc_rule(index, 2)
+	assert (pd.Series(0, index=index).resample(rule).size() > 0).sum() <= 2
+	index = pd.date_range('1990-01-01', periods=365 * 30, freq='D')
+	with warnings.catch_warnings(record=True) as w:
+		warnings.simplefilter('always')
+		assert_equals(cf.tools.get_ohlc_rule(index, 5), 'YS')
+	assert any('max_bars' in str(x.message) for x in w)
+	# trading hours only fill a fraction of each day
+	days = pd.bdate_range('2021-01-04', periods=252)
+	hours = pd.DatetimeIndex(np.concatenate([
+		pd.date_range(day + pd.Timedelta('9h30min'), periods=390, freq='min') for day in days]))
+	assert_equals(cf.tools.get_ohlc_rule(hours, 20000), '5min')
+	assert_equals(cf.tools.get_ohlc_rule(hours, 5000), '30min')
+	for max_bars in (20000, 5000):
+		rule = cf.tools.get_ohlc_rule(hours, max_bars)
+		assert_equals((pd.Series(0, index=hours).resample(rule).size() > 0).sum(),
+					  {20000: 19656, 5000: 3276}[max_bars])
+	assert_equals(cf.tools.get_ohlc_rule(hours.tz_localize('US/Eastern'), 5000), '30min')
+	assert_equals(list(cf.tools._index_strings(index[:2])), ['1990-01-01', '1990-01-02'])
+	index = pd.date_range('2021-01-04 09:30', periods=3, freq='min')
+	assert_equals(list(cf.tools._index_strings(index)), list(index.astype('str')))
+
+
+def encoding_input_argument_tests():
+	options = {
+		'kind': ['scatter', 'bar', 'heatmap']
+	}
+
+	def encoding_test(self, **kwargs):
+		import base64, warnings
+		with warnings.catch_warnings(record=True) as w:
+			warnings.simplefilter('always')
+			fig = self._iplot(self.df, encoding='base64', **kwargs)
+		if cf.tools.get_plotlyjs_version() < (2, 28):
+			# older plotly.js cannot read typed arrays
+			assert any('2.28' in str(x.message) for x in w)
+			assert isinstance(fig['data'][0]['z' if kwargs.get('kind') == 'heatmap' else 'y'],
+							  (list, tuple, np.ndarray))
+			fig = cf.tools.encode_figure(self._iplot(self.df, **kwargs), plotlyjs_version='2.28.0')
+		trace = fig['data'][0]
+		key = 'z' if kwargs.get('kind') == 'heatmap' else 'y'
+		typed = trace[key]
+		values = np.frombuffer(base64.b64decode(typed['bdata']),
+							   dtype=np.dtype(typed['dtype']).newbyteorder('<'))
+		expected = np.asarray(self.df.values.T if key == 'z' else self.df[trace['name']],
+							  dtype=float).ravel()
+		assert np.allclose(values.astype(float), expected)
+
+	_generate_tests(TestIPlot, encoding_test, 'encoding', options)
+
+
+def serializer_input_argument_tests():
+	df = cf.datagen.lines(3, 100)
+	df.iloc[5, 0] = np.nan
+	options = {
+		'kind': ['scatter', 'bar', 'heatmap']
+	}
+
+	def serializer_test(self, **kwargs):
+		import json
+		fig = self._iplot(df, **kwargs)
+		assert_equals(json.loads(cf.tools.to_json(fig, 'json')),
+					  json.loads(cf.tools.to_json(fig, 'auto')))
+
+	_generate_tests(TestIPlot, serializer_test, 'serializer', options)
+
+
+def spread_input_argument_tests():
+	df = cf.datagen.lines(3, columns=['a', 'b', 'c'])
+	options = {
+		'kind': ['spread', 'ratio'],
+		'spread_base': ['b']
+	}
+
+	def spread_test(self, **kwargs):
+		kwargs.setdefault('kind', 'spread')
+		fig = self._iplot(df, **kwargs)
+		base = kwargs.get('spread_base', 'b')
+		others = ['a', 'c'] if 'spread_base' in kwargs else ['a']
+		y = pd.DataFrame([pd.to_numeric(pd.Series(t['y']), errors='coerce')
+						  for t in fig['data'] if t['yaxis'] == 'y2']).T
+		y = y.sum(axis=1, min_count=1) if len(others) == 1 else y
+		if kwargs['kind'] == 'spread':
+			expected = df[others].sub(df[base], axis=0)
+			if len(others) > 1:
+				y = pd.concat([y.iloc[:, [0, 1]].sum(axis=1, min_count=1),
+							   y.iloc[:, [2, 3]].sum(axis=1, min_count=1)], axis=1)
+		else:
+			expected = df[others].div(df[base], axis=0)
+		assert np.allclose(np.asarray(y, dtype=float).reshape(expected.shape),
+						   expected.values)
+		if kwargs['kind'] == 'spread' and len(others) > 1:
+			line_colors = dict((t['name'], t['line']['color']) for t in fig['data'][:3])
+			fills = [(t['name'], t['fillcolor']) for t in fig['data'] if t['yaxis'] == 'y2']
+			assert_equals(fills, [('Spread({0})'.format(c), cf.to_rgba(line_colors[c], a))
+								  for c in others for a in (.5, .15)])
+
+	_generate_tests(TestIPlot, spread_test, 'spread', options)
+
+
 def area_plot_input_argument_tests():
 	options = {
 		'fill': [True],
@@ -155,6 +437,52 @@ def bubble_chart_argument_tests():
 	_generate_tests(TestIPlot, bubble_test, 'bubble', options)
 
 
+def bubble_size_color_argument_tests():
+	df = cf.datagen.bubble3d(3, 20)
+	options = {
+		'kind': ['bubble3d'],
+		'abs_size': [True],
+		'colorby': ['z']
+	}
+
+	def bubble_size_color_test(self, **kwargs):
+		fig = self._iplot(df, **dict({'kind': 'bubble', 'x': 'x', 'y': 'y', 'z': 'z',
+									  'size': 'size'}, **kwargs))
+		marker = fig['data'][0]['marker']
+		size = np.asarray(marker['size'], dtype=float)
+		if kwargs.get('abs_size'):
+			assert np.allclose(size, df['size'])
+		else:
+			assert_equals((size.min(), size.max()), (12, 112))
+		if 'colorby' in kwargs:
+			assert np.allclose(np.asarray(marker['color'], dtype=float), df['z'])
+
+	_generate_tests(TestIPlot, bubble_size_color_test, 'bubble_size_color', options)
+
+
+def categories_input_argument_tests():
+	df = cf.datagen.bubble3d(4, 30)
+	options = {
+		'kind': ['scatter', 'bubble', 'scatter3d', 'bubble3d'],
+		'text': ['text']
+	}
+
+	def categories_test(self, **kwargs):
+		kind = kwargs.get('kind', 'scatter')
+		if 'bubble' in kind:
+			kwargs['size'] = 'size'
+		fig = self._iplot(df, x='x', y='y', z='z',
+						  categories='categories', **kwargs)
+		assert_equals(len(fig['data']), 4)
+		for trace in fig['data']:
+			_df = df[df['categories'] == trace['name']]
+			assert_equals(list(trace['x']), list(_df['x']))
+			if 'bubble' in kind:
+				assert_equals(len(trace['marker']['size']), len(_df))
+
+	_generate_tests(TestIPlot, categories_test, 'categories', options)
+
+
 def subplot_input_argument_tests():
 	options = {
 		'shape': [(3, 1)],
@@ -199,6 +527,75 @@ def color_normalize_tests():
 		assert_equals(v,cf.normalize(k).upper())
 	return 2
 
+def test_color_conversions():
+	assert_equals(cf.colors.to_rgba('#f03', .7), 'rgba(255, 0, 51, 0.7)')
+	assert_equals(cf.colors.to_rgba('rgba(23, 23, 23, .3)', None), 'rgba(23, 23, 23, 0.3)')
+	assert_equals(cf.colors.to_rgba(('pearl', .5), None), 'rgba(217, 217, 217, 0.5)')
+	assert_equals(cf.colors.hex_to_rgb('#E1E5ED'), 'rgb(225, 229, 237)')
+	assert_equals(cf.colors.rgb_to_hex('rgb(23,25,24)'), '#171918')
+	assert_equals(cf.colors.rgba_to_rgb('rgba(0,0,0,.5)'), 'rgb(127, 127, 127)')
+	assert_equals(cf.normalize('rgba(0,0,0,.5)'), '#7F7F7F')
+	for color in ('rgb(__import__("os"),0,0)', 'rgb(1,2)', '#GGG', 'notacolor'):
+		try:
+			cf.normalize(color)
+		except cf.colors.CufflinksError:
+			pass
+		else:
+			raise AssertionError(color)
+
+def test_scale_lookup():
+	scale = cf.colors.get_scales('accent')
+	scale.reverse()
+	assert_equals(cf.colors.get_scales('-accent'), scale)
+	assert_equals(cf.colors.get_scales('accent', 2), cf.colors.get_scales('accent', 3))
+	cf.colors.reset_scales()
+	assert cf.colors._scales_names is None
+	assert_equals(cf.colors.get_scales('-accent'), scale)
+
+def test_palette():
+	classic = cf.colors.get_palette(['red', 'blue'], 4)
+	assert_equals(classic[:2], [cf.colors.to_rgba('red', 1.0), cf.colors.to_rgba('blue', 1.0)])
+	assert classic[2].startswith(cf.colors.to_rgba('blue', .9)[:-4])
+	palette = cf.colors.get_palette(scale='ggplot', n=3000)
+	assert_equals(len(set(palette)), 3000)
+	assert_equals(palette, cf.colors.get_palette(scale='ggplot', n=3000))
+	# one color per point: colors run out near white and must not hang,
+	# such palettes are not cached
+	cached = cf.colors._get_palette.cache_info().currsize
+	palette = cf.colors.get_palette(n=20000)
+	assert_equals(len(palette), 20000)
+	assert len(set(palette)) > 19900
+	assert_equals(cf.colors._get_palette.cache_info().currsize, cached)
+
+def test_interp():
+	assert_equals(cf.colors.interp(['rgb(255,0,0)', 'rgb(0,0,255)'], 5),
+				  ['#FF0000', '#FF0080', '#FF00FF', '#8000FF', '#0000FF'])
+	assert_equals(cf.colors.interp(['red', 'blue'], 3, 'rgb')[0], cf.normalize('red').upper())
+	scale = cf.colors.interp(['#f03', 'pearl'], 10, space='lab')
+	assert_equals((len(scale), scale[0], scale[-1]), (10, '#FF0033', '#D9D9D9'))
+
+def test_map_values():
+	rgba = cf.colors.map_values([0, .5, 1, np.nan], ['#000000', 'rgba(255,255,255,.5)'])
+	assert np.allclose(rgba, [[0, 0, 0, 1], [127.5, 127.5, 127.5, .75],
+							  [255, 255, 255, .5], [0, 0, 0, 0]])
+	marker = cf.colors.get_marker_colors([2, 4, 6], 'blues')
+	assert_equals((marker['cmin'], marker['cmax']), (2.0, 6.0))
+	assert_equals(marker['colorscale'], cf.colors.get_colorscale('blues'))
+
+def test_quant_figure_volume_colors():
+	df = cf.datagen.ohlcv()
+	qf = cf.QuantFig(df)
+	qf.add_volume()
+	bars = [t for t in qf.figure()['data'] if t['type'] == 'bar'][0]
+	up = np.asarray(df['close'].diff() > 0, dtype=float)
+	assert np.array_equal(np.asarray(bars['marker']['color']), up)
+	assert_equals(bars['marker']['cmin'], 0)
+	qf = cf.QuantFig(df)
+	qf.add_volume(colorchange=False)
+	bars = [t for t in qf.figure()['data'] if t['type'] == 'bar'][0]
+	up = np.asarray(df['volume'].diff() > 0, dtype=float)
+	assert np.array_equal(np.asarray(bars['marker']['color']), up)
+
 # technical analysis
 
 def ta_tests():
@@ -222,6 +619,135 @@ def quant_figure_tests():
 	qf.add_bollinger_bands()
 	return qf.figure()
 
+def test_quant_figure_cache():
+	qf = cf.QuantFig(cf.datagen.ohlcv())
+	qf.add_sma()
+	qf.add_rsi()
+	calls = []
+	get_study_figure = qf._get_study_figure
+	qf._get_study_figure = lambda k, **kw: calls.append(k) or get_study_figure(k, **kw)
+	fig = qf.figure()
+	assert_equals(qf.figure().to_json(), fig.to_json())
+	assert_equals(sorted(calls), ['rsi', 'sma'])
+	qf.add_ema()
+	qf.figure()
+	assert_equals(calls[2:], ['ema'])
+	qf.studies['rsi']['display']['color'] = 'red'
+	qf.figure()
+	assert_equals(calls[3:], ['rsi'])
+	qf.df = qf.df.assign(close=qf.df['close'] * 2)
+	qf.figure()
+	assert_equals(len(calls), 7)
+	# changes made in place
+	qf.df['close'] = qf.df['close'] * 2
+	fig = qf.figure()
+	assert_equals(len(calls), 10)
+	assert np.allclose(np.asarray(fig['data'][-1]['close'], dtype=float), qf.df['close'].values)
+	qf.df.iloc[len(qf.df) // 2, 0] += 1
+	qf.figure()
+	assert_equals(len(calls), 13)
+	qf.figure()
+	assert_equals(len(calls), 13)
+	qf = cf.QuantFig(qf.df, hash_data=True)
+	qf.add_sma()
+	qf.figure()
+	get_study_figure = qf._get_study_figure
+	qf._get_study_figure = lambda k, **kw: calls.append(k) or get_study_figure(k, **kw)
+	# swapped values keep the column sums, only hash_data detects them
+	qf.df.iloc[1, 0], qf.df.iloc[2, 0] = qf.df.iloc[2, 0], qf.df.iloc[1, 0]
+	qf.figure()
+	assert_equals(len(calls), 14)
+
+def test_quant_figure_render_many():
+	import json, os, shutil, tempfile
+	import plotly.io as pio
+	frames = dict(('T{0}'.format(i), cf.datagen.ohlcv(n=100)) for i in range(3))
+	qf = cf.QuantFig(frames['T0'], title='EOD')
+	qf.add_sma()
+	qf.add_volume()
+	output_dir = tempfile.mkdtemp()
+	try:
+		result = qf.render_many(frames, output_dir, n_jobs=1, format='json')
+		assert cf.quant_figure._RENDER_TEMPLATE is None
+		assert_equals(result.index.tolist(), ['T0', 'T1', 'T2'])
+		assert result['error'].isnull().all()
+		with open(result['path']['T0']) as f:
+			assert_equals(json.load(f)['data'], json.loads(pio.to_json(qf.figure()))['data'])
+		result = qf.render_many(dict(frames, bad=frames['T0'][['close']]), output_dir, n_jobs=2)
+		assert_equals(sorted(os.listdir(output_dir))[:3], ['T0.html', 'T0.json', 'T1.html'])
+		assert_equals(result['error'].notnull().tolist(), [False, False, False, True])
+		for duplicated in ([('T0', frames['T0'])] * 2, {'a/b': frames['T0'], 'a_b': frames['T1']}):
+			try:
+				qf.render_many(duplicated, output_dir, n_jobs=1)
+			except Exception as e:
+				assert 'Duplicated' in str(e)
+			else:
+				raise AssertionError(duplicated)
+	finally:
+		shutil.rmtree(output_dir)
+
+def test_quant_figure_frames():
+	df = cf.datagen.ohlcv(n=300)
+	qf = cf.QuantFig(df, resample='W')
+	qf.add_sma()
+	qf.add_rsi()
+	qf.add_volume()
+	calls = []
+	get_resampled = qf._get_resampled
+	qf._get_resampled = lambda *a, **kw: calls.append(a) or get_resampled(*a, **kw)
+	fig = qf.figure()
+	frame = qf._get_frame((None, None), 'W').copy()
+	assert_equals(len(calls), 2)
+	qf.add_ema()
+	assert_equals(list(qf.figure()['data'][0]['y']), list(fig['data'][0]['y']))
+	assert_equals(len(calls), 2)
+	assert qf._cache.frames[cf.quant_figure._cache_key((None, None), 'W')].equals(frame)
+	qf.figure(resample='M')
+	assert_equals(len(calls), 3)
+	for rule in ('2D', '3D', '4D', '5D', 'M'):
+		qf.figure(resample=rule)
+	assert_equals(len(qf._cache.frames), cf.quant_figure._FRAMES_CACHE_SIZE)
+	assert cf.quant_figure._cache_key((None, None), 'W') not in qf._cache.frames
+	assert_equals(list(qf._cache.frames)[-1], cf.quant_figure._cache_key((None, None), 'M'))
+	del calls[3:]
+	qf.df = qf.df.assign(close=qf.df['close'] * 2)
+	qf.figure()
+	assert_equals(len(calls), 4)
+
+def test_quant_figure_append():
+	import json
+	from cufflinks.quant_figure import extend_figure
+	df = cf.datagen.ohlcv(n=120)
+	def quant_fig(df):
+		qf = cf.QuantFig(df)
+		qf.add_volume()
+		qf.add_sma([5, 10])
+		qf.add_bollinger_bands(periods=10)
+		qf.add_rsi(periods=10)
+		qf.add_macd()
+		qf.add_dmi(periods=5)
+		return qf
+	qf = quant_fig(df.iloc[:100])
+	fig = qf.figure()
+	extend_figure(fig, qf.append(df.iloc[100:110]))
+	for i in range(110, 120):
+		bar = df.iloc[i]
+		patch = qf.append(bar * 1.1)
+		json.dumps(patch)
+		extend_figure(fig, patch)
+		patch = qf.update_last(bar)
+		json.dumps(patch)
+		assert_equals(patch['replace'], 1)
+		extend_figure(fig, patch)
+	assert qf.df.equals(df)
+	assert qf['df'].equals(df)
+	nan = lambda v: np.array([np.nan if _ == '' else _ for _ in v], dtype=float)
+	for streamed, trace in zip(fig['data'], quant_fig(df).figure()['data']):
+		assert_equals(list(streamed['x']), list(trace['x']))
+		for attr in ('y', 'close', 'high'):
+			if attr in trace and trace[attr] is not None:
+				assert np.allclose(nan(streamed[attr]), nan(trace[attr]), equal_nan=True)
+
 def bestfit():
 
 	df = cf.datagen.scatter()
@@ -277,11 +803,20 @@ def _generate_test(test_func, **kwargs):
 bar_input_argument_tests()
 bar_row_input_argument_tests()
 histogram_input_argument_tests()
+histogram_prebin_input_argument_tests()
 box_input_argument_tests()
+box_precompute_input_argument_tests()
 heatmap_input_argument_tests()
+heatmap_max_cells_input_argument_tests()
+candle_input_argument_tests()
+encoding_input_argument_tests()
+serializer_input_argument_tests()
+spread_input_argument_tests()
 area_plot_input_argument_tests()
 scatter_plot_input_argument_tests()
 bubble_chart_argument_tests()
+bubble_size_color_argument_tests()
+categories_input_argument_tests()
 subplot_input_argument_tests()
 shape_input_argument_tests()
 test_irregular_subplots()